@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import convert
+import preview
+from bitpack import pack_bitmap, pack_glyphs
+from compose import (
+    COMPOSED_CACHE_SIZE,
+    ComposedGlyphCache,
+    CompositionAtlas,
+    load_component_bitmap_file,
+    parse_bitmap_line,
+)
+from font_cache import clear_font_cache
+from glyph_metrics import render_glyphs
+
+# 벤치마크 기본 설정 (font/ 에 포함된 폰트만 사용하므로 오프라인에서 실행 가능)
+default_font = "font/Sam3KRFont.ttf"
+default_sizes = [10, 16, 24]
+default_counts = [100, 1000, 11172]
+
+
+def measure(stage, size, count, func, setup=None):
+    """
+    func()를 실행하여 소요 시간, 초당 글리프 수, 최대 메모리 사용량을 측정합니다.
+    시간은 tracemalloc 없이 한 번, 메모리는 tracemalloc 기준 최대 할당량(numpy 버퍼 포함)을
+    따로 한 번 더 실행하여 측정합니다. (추적 부하가 시간에 섞이지 않도록)
+    setup이 주어지면 각 실행 전에 호출합니다. (캐시를 비워 두 실행을 같은 조건으로 맞출 때)
+    """
+    if setup is not None:
+        setup()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "stage": stage,
+        "size": size,
+        "count": count,
+        "seconds": round(elapsed, 6),
+        "glyphs_per_sec": round(count / elapsed, 1) if elapsed > 0 else None,
+        "peak_bytes": peak,
+    }
+
+
+def bench_size(size, count, workdir):
+    """한 (size, 글리프 수) 조합에 대해 단계별 측정 결과 목록을 반환합니다."""
+    chars = [chr(i) for i in range(0xAC00, 0xAC00 + count)]
+    results = []
+
+    # 1) 렌더링 (FreeType → 1비트 numpy 배열)
+    bitmaps = []
+
+    def render():
+        bitmaps[:] = [convert.render_complete_bitmap(char, size) for char in chars]
+
+    results.append(measure("render", size, count, render, clear_font_cache))
+    stacked = np.stack(bitmaps)
+    # 바운딩 박스 표가 채워진 뒤의 묶음 렌더링 (getbbox 없이 잉크 영역만 래스터화)
+    results.append(
+        measure(
+            "render_batch",
+            size,
+            count,
+            lambda: render_glyphs(convert.font_paths[size], size, chars),
+        )
+    )
+
+    # 2) 패킹 (글리프 단위 / 묶음 단위)
+    results.append(
+        measure("pack", size, count, lambda: [pack_bitmap(b) for b in bitmaps])
+    )
+    results.append(measure("pack_batch", size, count, lambda: pack_glyphs(stacked)))
+
+    # 3) 직렬화 (C 배열 텍스트)
+    packed = pack_glyphs(stacked).reshape(count, -1)
+    filename = os.path.join(workdir, f"hangul_complete_{size}x{size}.txt")
+    results.append(
+        measure(
+            "serialize",
+            size,
+            count,
+            lambda: convert.save_complete_bitmap_to_file(filename, zip(chars, packed)),
+        )
+    )
+
+    # 4) 파싱 (텍스트 테이블 → 비트맵)
+    with open(filename, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    results.append(
+        measure(
+            "parse_line",
+            size,
+            count,
+            lambda: [parse_bitmap_line(line, size, size) for line in lines],
+        )
+    )
+    results.append(
+        measure(
+            "parse_file",
+            size,
+            count,
+            lambda: load_component_bitmap_file(filename, size, size),
+        )
+    )
+
+    # 5) 합성 (초성·중성·종성 테이블 → 음절)
+    comp_dicts = {
+        component: load_component_bitmap_file(
+            f"hangul_{size}x{size}_{component}.txt", size, size
+        )
+        for component in ["choseong", "jungseong", "jongseong"]
+    }
+    text = "".join(chars)
+    results.append(
+        measure(
+            "composite_syllable",
+            size,
+            count,
+            lambda: [
+                preview.composite_syllable(ch, size, size, comp_dicts) for ch in text
+            ],
+        )
+    )
+    results.append(
+        measure(
+            "composite_string",
+            size,
+            count,
+            lambda: preview.composite_string(text, size, size, comp_dicts),
+        )
+    )
+    atlas = CompositionAtlas(comp_dicts, size, size)
+    results.append(
+        measure("atlas_compose_string", size, count, lambda: atlas.compose_string(text))
+    )
+    # 캐시 적중 경로: 캐시에 다 들어가는 음절 집합에서 앞쪽 음절이 자주 나오도록(Zipf 분포)
+    # 반복해서 뽑은 표본을, 미리 채워 둔 전용 캐시로 조회합니다.
+    cache = ComposedGlyphCache()
+    cached_atlas = CompositionAtlas(comp_dicts, size, size, cache)
+    vocabulary = chars[: min(len(chars), COMPOSED_CACHE_SIZE // 2)]
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    sample = np.random.default_rng(0).choice(
+        len(vocabulary), size=count, p=weights / weights.sum()
+    )
+    sample_text = [vocabulary[i] for i in sample]
+
+    def warm_cache():
+        for ch in vocabulary:
+            cached_atlas.glyph(ch)
+        cache.hits = cache.misses = 0
+
+    result = measure(
+        "atlas_glyph_cached",
+        size,
+        count,
+        lambda: [cached_atlas.glyph(ch) for ch in sample_text],
+        setup=warm_cache,
+    )
+    result["hit_ratio"] = round(cache.stats()["hit_ratio"], 4)
+    results.append(result)
+    atlas.syllable_bitmaps()
+    results.append(
+        measure("atlas_render_lines", size, count, lambda: atlas.render_lines(text, 32))
+    )
+    return results
+
+
+def git_revision():
+    """현재 커밋 해시를 반환합니다. (git 저장소가 아니면 None)"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="변환·파싱·합성 단계별 벤치마크")
+    parser.add_argument("--font", default=default_font, help="렌더링에 사용할 폰트")
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    parser.add_argument("--counts", type=int, nargs="+", default=default_counts)
+    parser.add_argument(
+        "-o", "--output", help="결과를 JSON으로 저장할 파일 (커밋 간 diff 용)"
+    )
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        convert.font_paths[size] = args.font
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            for count in args.counts:
+                # 앞선 (size, 글리프 수)에서 채워진 캐시가 다음 측정에 섞이지 않도록 비움
+                clear_font_cache()
+                for result in bench_size(size, count, workdir):
+                    results.append(result)
+                    print(
+                        f"{result['stage']:>22} {size:>3}x{size:<3} {count:>6}자 "
+                        f"{result['seconds']:>10.4f}s "
+                        f"{result['glyphs_per_sec'] or 0:>12.1f} glyphs/s "
+                        f"{result['peak_bytes'] / 1024:>10.1f} KiB"
+                    )
+
+    if args.output:
+        report = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "font": args.font,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import numpy as np
+
+# ==========================================================
+# 출력 바이트 레이아웃
+#   row_msb : 행 우선, 한 바이트에 가로 8픽셀, 왼쪽 픽셀이 MSB (기본값, 기존 테이블 형식)
+#   row_lsb : 행 우선, 한 바이트에 가로 8픽셀, 왼쪽 픽셀이 LSB
+#   page    : SSD1306/SH1106 페이지 형식. 8행을 한 페이지로 묶어, 한 바이트에 세로 8픽셀
+#             (위쪽 픽셀이 LSB), 페이지마다 왼쪽 열부터 순서대로 저장
+# ==========================================================
+LAYOUTS = ("row_msb", "row_lsb", "page")
+
+
+def pack_bitmap(bitmap):
+    """
+    1비트 글리프 비트맵(0=검정 글자, 1=흰 배경)을 OLED용 바이트 배열로 변환합니다.
+    각 행은 MSB부터 채우고, 폭이 8의 배수가 아니면 행 끝을 0으로 패딩합니다.
+    (기존 픽셀 단위 루프와 바이트 단위로 동일한 결과)
+    """
+    return pack_glyphs(bitmap).reshape(-1).tolist()
+
+
+def pack_glyphs(bitmaps, layout="row_msb"):
+    """
+    (H, W) 단일 글리프 또는 (N, H, W)로 쌓인 글리프 묶음을
+    np.packbits 한 번으로 패킹하여 (..., H, (W + 7) // 8) uint8 배열로 반환합니다.
+    입력 값 0(검정)이 비트 1이 됩니다. layout을 주면 해당 레이아웃으로 패킹합니다.
+    """
+    bitmaps = np.asarray(bitmaps)
+    return pack_bits(bitmaps == 0, layout)
+
+
+def compile_mask(mask_region, width, height):
+    """
+    마스킹 영역 목록을 한 번만 계산하여 (H, (W + 7) // 8) 패킹 마스크로 변환합니다.
+    비트 1은 남길 픽셀, 0은 지울(흰색으로 만들) 픽셀입니다.
+
+    mask_region의 각 항목은 다음 중 하나입니다.
+      - (x0, y0, x1, y1) 사각형: draw.rectangle과 같이 양 끝 좌표를 포함합니다.
+      - 1비트 스텐실 이미지(PIL 모드 "1" 이미지 또는 같은 규칙의 0/1 배열):
+        검정(0) 픽셀 영역을 지웁니다.
+    """
+    keep = np.ones((height, width), dtype=bool)
+    for mask in mask_region or ():
+        if isinstance(mask, (tuple, list)) and len(mask) == 4:
+            x0, y0, x1, y1 = mask
+            keep[max(y0, 0) : max(y1 + 1, 0), max(x0, 0) : max(x1 + 1, 0)] = False
+        else:
+            stencil = np.asarray(mask)
+            if stencil.shape != (height, width):
+                raise ValueError(
+                    f"스텐실 크기 {stencil.shape}가 글리프 크기 {(height, width)}와 다릅니다"
+                )
+            keep &= stencil != 0
+    return np.packbits(keep, axis=-1)
+
+
+def apply_mask(packed, mask):
+    """
+    compile_mask로 만든 마스크를 패킹된 글리프 하나 또는 묶음 전체에 비트 AND 한 번으로 적용합니다.
+    """
+    return np.bitwise_and(packed, mask)
+
+
+def layout_shape(width, height, layout="row_msb"):
+    """레이아웃별 글리프 하나의 바이트 배열 모양을 반환합니다."""
+    if layout == "page":
+        return ((height + 7) // 8, width)
+    if layout in ("row_msb", "row_lsb"):
+        return (height, (width + 7) // 8)
+    raise ValueError(f"알 수 없는 레이아웃: {layout!r} (가능한 값: {', '.join(LAYOUTS)})")
+
+
+def pack_bits(bits, layout="row_msb"):
+    """
+    글자 픽셀이 1인 (..., H, W) 비트 배열을 지정한 레이아웃으로 한 번에 패킹합니다.
+    page 레이아웃은 묶음 전체에 대해 행·열을 바꾸는(bit-transpose) 연산 한 번으로 계산합니다.
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    if layout == "row_msb":
+        return np.packbits(bits, axis=-1)
+    if layout == "row_lsb":
+        return np.packbits(bits, axis=-1, bitorder="little")
+    if layout == "page":
+        height = bits.shape[-2]
+        pages = (height + 7) // 8
+        pad = [(0, 0)] * (bits.ndim - 2) + [(0, pages * 8 - height), (0, 0)]
+        bits = np.pad(bits, pad)
+        # (..., 페이지, 8행, W) → (..., 페이지, W, 8행)으로 바꿔 세로 8픽셀을 한 바이트로
+        bits = bits.reshape(bits.shape[:-2] + (pages, 8, bits.shape[-1]))
+        packed = np.packbits(np.swapaxes(bits, -1, -2), axis=-1, bitorder="little")
+        return packed[..., 0]
+    layout_shape(0, 0, layout)  # 알 수 없는 레이아웃이면 ValueError
+
+
+def unpack_bits(packed, width, height, layout="row_msb"):
+    """pack_bits의 역변환: 레이아웃별 패킹 배열을 (..., H, W) 비트 배열(1=글자)로 되돌립니다."""
+    packed = np.asarray(packed, dtype=np.uint8)
+    if layout == "row_msb":
+        return np.unpackbits(packed, axis=-1, count=width)
+    if layout == "row_lsb":
+        return np.unpackbits(packed, axis=-1, count=width, bitorder="little")
+    if layout == "page":
+        bits = np.unpackbits(packed[..., np.newaxis], axis=-1, bitorder="little")
+        bits = np.swapaxes(bits, -1, -2)
+        bits = bits.reshape(bits.shape[:-3] + (-1, width))
+        return bits[..., :height, :]
+    layout_shape(0, 0, layout)
+
+
+def relayout(packed, width, height, layout):
+    """기본(row_msb) 패킹 배열 (..., H, 행당 바이트 수)을 다른 레이아웃으로 한 번에 변환합니다."""
+    if layout == "row_msb":
+        return np.asarray(packed, dtype=np.uint8)
+    return pack_bits(unpack_bits(packed, width, height), layout)
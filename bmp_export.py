@@ -0,0 +1,103 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+# 1bpp BMP 팔레트: 0=검정, 1=흰색 (PIL이 모드 "1" 이미지를 저장하는 방식과 동일)
+BMP_PALETTE = b"\x00\x00\x00\x00\xff\xff\xff\x00"
+BMP_HEADER_SIZE = 14 + 40 + len(BMP_PALETTE)
+# 해상도 72 DPI (PIL 기본값과 동일, 픽셀/미터)
+BMP_PPM = 3780
+
+
+def bmp_header(width, height):
+    """
+    width×height 1bpp BMP의 파일 헤더 + 정보 헤더 + 팔레트를 반환합니다.
+    같은 크기의 글리프는 모두 같은 헤더를 쓰므로 크기별로 한 번만 만들어 재사용합니다.
+    """
+    stride = (width + 31) // 32 * 4
+    image_size = stride * height
+    file_header = struct.pack(
+        "<2sIHHI", b"BM", BMP_HEADER_SIZE + image_size, 0, 0, BMP_HEADER_SIZE
+    )
+    info_header = struct.pack(
+        "<IiiHHIIiiII",
+        40,
+        width,
+        height,
+        1,
+        1,
+        0,
+        image_size,
+        BMP_PPM,
+        BMP_PPM,
+        2,
+        2,
+    )
+    return file_header + info_header + BMP_PALETTE
+
+
+def encode_bmp_rows(packed, width):
+    """
+    패킹된 글리프 묶음 (N, H, 행당 바이트 수)(비트 1=검정)을 BMP 픽셀 데이터로 한 번에 변환합니다.
+    비트를 반전(1=흰색)하고, 행을 4바이트 단위로 패딩한 뒤 아래쪽 행부터 저장되도록 뒤집어
+    (N, H × stride) uint8 배열로 반환합니다.
+    """
+    packed = np.asarray(packed, dtype=np.uint8)
+    n, height, bytes_per_row = packed.shape
+    stride = (width + 31) // 32 * 4
+
+    # 마지막 바이트의 패딩 비트는 0으로 유지
+    valid = np.packbits(np.ones(width, dtype=np.uint8))
+    rows = np.zeros((n, height, stride), dtype=np.uint8)
+    rows[:, :, :bytes_per_row] = ~packed & valid
+    return rows[:, ::-1, :].reshape(n, -1)
+
+
+def save_bmp_files(output_dir, size, chars, packed):
+    """
+    글리프마다 unicode_{size}x{size}_{문자}.bmp 파일을 만듭니다.
+    PIL 인코더를 거치지 않고, 미리 만든 헤더와 한 번에 변환한 픽셀 데이터를 그대로 기록합니다.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    header = bmp_header(size, size)
+    pixel_data = encode_bmp_rows(packed, size)
+    for char, data in zip(chars, pixel_data):
+        filename = f"unicode_{size}x{size}_{char}.bmp"
+        with open(os.path.join(output_dir, filename), "wb") as f:
+            f.write(header + data.tobytes())
+
+
+def save_bmp_atlas(filename, size, chars, packed, cols=32):
+    """
+    모든 글리프를 cols열 격자로 배치한 스프라이트 시트 BMP 한 장과,
+    문자별 좌표 인덱스 JSON({문자: [x, y, 폭, 높이]})을 filename과 같은 이름으로 저장합니다.
+    """
+    packed = np.asarray(packed, dtype=np.uint8)
+    n = len(packed)
+    rows_grid = max((n + cols - 1) // cols, 1)
+    sheet_width = cols * size
+    sheet_height = rows_grid * size
+
+    # (행, 열, H, W) 격자로 풀었다가 (rows_grid × H, cols × W) 한 장으로 합침
+    bitmaps = np.zeros((rows_grid * cols, size, size), dtype=np.uint8)
+    bitmaps[:n] = np.unpackbits(packed, axis=-1, count=size)
+    sheet = (
+        bitmaps.reshape(rows_grid, cols, size, size)
+        .transpose(0, 2, 1, 3)
+        .reshape(sheet_height, sheet_width)
+    )
+    sheet_packed = np.packbits(sheet, axis=-1)[np.newaxis]
+
+    with open(filename, "wb") as f:
+        f.write(bmp_header(sheet_width, sheet_height))
+        f.write(encode_bmp_rows(sheet_packed, sheet_width).tobytes())
+
+    index = {
+        char: [(i % cols) * size, (i // cols) * size, size, size]
+        for i, char in enumerate(chars)
+    }
+    index_filename = os.path.splitext(filename)[0] + ".json"
+    with open(index_filename, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
@@ -0,0 +1,260 @@
+import argparse
+import glob
+import json
+import os
+from contextlib import ExitStack
+
+from bitpack import LAYOUTS, pack_glyphs
+from compose import (
+    CHOSEONG_COUNT,
+    HANGUL_BASE,
+    HANGUL_COUNT,
+    JONGSEONG_COUNT,
+    JUNGSEONG_COUNT,
+)
+from convert import chunk_size, save_complete_bitmap_to_file
+from fonttable import GlyphDeduplicator, GlyphTableWriter, format_dedup_stats
+from glyph_cache import font_digest
+from glyph_codec import CompressedTableWriter
+from glyph_metrics import render_glyphs
+from instrument import PoolTask, merge_pool_results, profile_run, stage, worker_pool
+
+# ==========================================================
+# 폰트 × 크기 × 문자 집합 매트릭스 빌드
+#
+# 각 (폰트, 크기, 문자 집합) 칸의 테이블을 chunk_size 단위 작업으로 나누어
+# 하나의 프로세스 풀에 한꺼번에 넘기고, 결과는 작업 순서대로 받아 테이블별로 기록합니다.
+# 폰트 핸들과 바운딩 박스 표(glyph_metrics)는 worker마다 캐시에 유지되어
+# 같은 (폰트, 크기)의 작업끼리 재사용됩니다. (KS X 1001 음절은 완성형에서 구한 메트릭을 그대로 사용)
+#
+# 출력: {output_dir}/{폰트 이름}/ 아래에 기존 스크립트와 같은 이름의 테이블
+#       (hangul_complete_{size}x{size}.*, hangul_ksx1001_{size}x{size}.*,
+#        hangul_{size}x{size}_{choseong,jungseong,jongseong}.*)과
+#       전체 목록 {output_dir}/manifest.json
+# ==========================================================
+default_font_dir = "font"
+default_sizes = [10, 16, 24]
+CHARSETS = ("complete", "ksx1001", "jamo")
+
+
+def charset_tables(charset, size):
+    """문자 집합 하나를 (테이블 이름, 문자 목록) 쌍의 목록으로 반환합니다."""
+    if charset == "complete":
+        chars = [chr(HANGUL_BASE + i) for i in range(HANGUL_COUNT)]
+        return [(f"hangul_complete_{size}x{size}", chars)]
+    if charset == "ksx1001":
+        # KS X 1001 현대 한글 2,350자 (공백 없이 이어진 문자열)
+        with open("ksx1001_hangul.txt", "r", encoding="utf-8") as f:
+            chars = list(f.read().strip())
+        return [(f"hangul_ksx1001_{size}x{size}", chars)]
+    if charset == "jamo":
+        # convert_mono.py와 같은 범위 (종성은 채움 문자 U+11A7 제외)
+        return [
+            (
+                f"hangul_{size}x{size}_choseong",
+                [chr(0x1100 + i) for i in range(CHOSEONG_COUNT)],
+            ),
+            (
+                f"hangul_{size}x{size}_jungseong",
+                [chr(0x1161 + i) for i in range(JUNGSEONG_COUNT)],
+            ),
+            (
+                f"hangul_{size}x{size}_jongseong",
+                [chr(0x11A8 + i) for i in range(JONGSEONG_COUNT - 1)],
+            ),
+        ]
+    raise ValueError(f"알 수 없는 문자 집합: {charset!r} (가능한 값: {', '.join(CHARSETS)})")
+
+
+def plan_tables(font_paths, sizes, charsets):
+    """매트릭스의 모든 칸을 펼쳐 테이블 목록(딕셔너리)을 만듭니다."""
+    tables = []
+    for font_path in font_paths:
+        font_name = os.path.splitext(os.path.basename(font_path))[0]
+        for size in sizes:
+            for charset in charsets:
+                for name, chars in charset_tables(charset, size):
+                    tables.append(
+                        {
+                            "font": font_path,
+                            "font_name": font_name,
+                            "size": size,
+                            "charset": charset,
+                            "name": name,
+                            "chars": chars,
+                        }
+                    )
+    return tables
+
+
+def iter_tasks(tables):
+    """모든 테이블을 (폰트, 크기, 음절 목록) 렌더링 작업으로 순서대로 나눕니다."""
+    for table in tables:
+        chars = table["chars"]
+        for i in range(0, len(chars), chunk_size):
+            yield table["font"], table["size"], chars[i : i + chunk_size]
+
+
+def render_task(task):
+    """
+    렌더링 작업 하나를 (N, H, 행당 바이트 수) 패킹 배열로 반환합니다.
+    프로세스 풀의 worker에서 호출됩니다.
+    """
+    font_path, size, chars = task
+    bitmaps = render_glyphs(font_path, size, chars)
+    with stage("pack"):
+        return pack_glyphs(bitmaps)
+
+
+def iter_table_glyphs(table, results):
+    """
+    작업 순서대로 나오는 결과(results)에서 이 테이블 몫의 청크만 꺼내
+    (문자, 패킹된 글리프) 쌍을 순서대로 내보냅니다.
+    """
+    chars = table["chars"]
+    for start in range(0, len(chars), chunk_size):
+        packed = next(results)
+        for char, glyph in zip(chars[start : start + chunk_size], packed):
+            yield char, glyph.reshape(-1)
+
+
+def write_table(table, glyphs, output_dir, layout, dedup=False, compress=False):
+    """테이블 하나를 기록하고, 매니페스트 항목(딕셔너리)을 반환합니다."""
+    size = table["size"]
+    table_dir = os.path.join(output_dir, table["font_name"])
+    os.makedirs(table_dir, exist_ok=True)
+    base_filename = os.path.join(table_dir, table["name"])
+    files = [base_filename + ".txt", base_filename + ".bin"]
+
+    deduplicator = GlyphDeduplicator() if dedup else None
+    with ExitStack() as stack:
+        sinks = [
+            stack.enter_context(
+                GlyphTableWriter(base_filename + ".bin", size, size, layout)
+            ),
+            deduplicator,
+        ]
+        if compress:
+            files.append(base_filename + ".hgc")
+            sinks.append(
+                stack.enter_context(
+                    CompressedTableWriter(base_filename + ".hgc", size, size)
+                )
+            )
+        save_complete_bitmap_to_file(
+            base_filename + ".txt",
+            glyphs,
+            *sinks,
+        )
+    entry = {
+        "font": table["font"],
+        "size": size,
+        "charset": table["charset"],
+        "table": table["name"],
+        "glyph_count": len(table["chars"]),
+    }
+    if deduplicator is not None:
+        stats = deduplicator.save(base_filename)
+        files += [base_filename + "_pool.txt", base_filename + "_index.txt"]
+        entry["unique_glyphs"] = stats["unique"]
+        print(format_dedup_stats(base_filename, stats))
+    entry["files"] = [os.path.relpath(path, output_dir) for path in files]
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="폰트 × 크기 × 문자 집합 매트릭스의 비트맵 폰트 테이블을 한 번에 생성"
+    )
+    parser.add_argument(
+        "--fonts",
+        nargs="+",
+        help=f"사용할 폰트 파일 (기본값: {default_font_dir}/ 의 모든 .ttf/.otf)",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    parser.add_argument(
+        "--charsets",
+        nargs="+",
+        choices=CHARSETS,
+        default=list(CHARSETS),
+        help="complete: 완성형 11,172자, ksx1001: KS X 1001 2,350자, jamo: 초성·중성·종성",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="렌더링에 사용할 프로세스 수 (기본값: CPU 수)",
+    )
+    parser.add_argument(
+        "-o", "--output-dir", default="build", help="출력 디렉토리 (기본값: build)"
+    )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="row_msb",
+        help="바이너리 테이블(.bin)의 바이트 레이아웃 (텍스트·압축 테이블은 항상 row_msb)",
+    )
+    parser.add_argument("--dedup", action="store_true")
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument(
+        "--profile",
+        help="단계별 시간·카운터·캐시 적중률을 기록할 파일 (.json이면 JSON, -면 표준 출력)",
+    )
+    args = parser.parse_args()
+
+    font_paths = args.fonts or sorted(
+        glob.glob(os.path.join(default_font_dir, "*.ttf"))
+        + glob.glob(os.path.join(default_font_dir, "*.otf"))
+    )
+    if not font_paths:
+        parser.error("사용할 폰트가 없습니다")
+    for font_path in font_paths:
+        if not os.path.exists(font_path):
+            parser.error(f"폰트 파일이 없습니다: {font_path}")
+
+    with profile_run(args.profile):
+        tables = plan_tables(font_paths, args.sizes, args.charsets)
+        pool = worker_pool(args.jobs) if args.jobs > 1 else None
+        try:
+            # 모든 칸의 작업을 한꺼번에 풀에 넘기므로, 앞 테이블을 기록하는 동안에도
+            # worker는 다음 테이블을 렌더링합니다.
+            if pool is not None:
+                results = merge_pool_results(
+                    pool.imap(PoolTask(render_task), iter_tasks(tables))
+                )
+            else:
+                results = map(render_task, iter_tasks(tables))
+            entries = []
+            for table in tables:
+                entry = write_table(
+                    table,
+                    iter_table_glyphs(table, results),
+                    args.output_dir,
+                    args.layout,
+                    args.dedup,
+                    args.compress,
+                )
+                entries.append(entry)
+                print(
+                    f"{entry['table']} ({table['font_name']}): {entry['glyph_count']}자"
+                )
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        manifest = {
+            "layout": args.layout,
+            "fonts": {path: font_digest(path) for path in font_paths},
+            "sizes": args.sizes,
+            "charsets": args.charsets,
+            "tables": entries,
+        }
+        with open(os.path.join(args.output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import hashlib
+import re
+from collections import OrderedDict
+
+import numpy as np
+
+from bitpack import layout_shape
+from fonttable import GlyphTableReader, fresh_table
+from instrument import count, stage
+
+# 완성형 한글 음절 범위와 구성요소 개수 (Unicode 공식 분해 규칙)
+HANGUL_BASE = 0xAC00
+HANGUL_COUNT = 11172
+CHOSEONG_COUNT = 19
+JUNGSEONG_COUNT = 21
+JONGSEONG_COUNT = 28
+
+# 중성 오프셋을 따로 주는 가로형 모음 (ㅗ, ㅡ, ㅜ)
+HORIZONTAL_JUNGSEONG = (chr(0x1169), chr(0x1173), chr(0x116E))
+
+# 합성된 음절 글리프 캐시에 유지할 최대 글리프 수
+# (자주 쓰는 음절 수백 자가 대부분을 차지하므로 이 정도면 충분)
+COMPOSED_CACHE_SIZE = 1024
+
+
+def parse_bitmap_line(line, width, height):
+    """
+    한 줄의 텍스트(예, 0x00, 0x00, ... // ᄀ (U+1100))에서
+    16진수 바이트 배열을 추출하여 width×height 크기의 2D numpy 배열(픽셀 값 0 또는 1)로 변환합니다.
+    여기서 1은 글자(원래 검정)이고, 0은 배경입니다.
+    """
+    hex_part = line.split("//")[0]
+    data = bytes.fromhex(hex_part.replace("0x", "").replace(",", " "))
+    bytes_per_row = (width + 7) // 8
+    packed = np.frombuffer(data, dtype=np.uint8, count=height * bytes_per_row)
+    return np.unpackbits(packed.reshape(height, bytes_per_row), axis=-1, count=width)
+
+
+# 텍스트 테이블 줄 끝 주석과, 주석 안의 코드 포인트 (예: // 가 (U+AC00))
+COMMENT_PATTERN = re.compile(rb"//[^\n]*")
+CODEPOINT_PATTERN = re.compile(rb"//[^\n]*?\(U\+([0-9A-Fa-f]+)\)")
+
+
+def load_bitmap_table(filename, width, height, layout="row_msb"):
+    """
+    텍스트 테이블(0xNN, ... // X (U+XXXX) 형식) 전체를 한 번에 읽어
+    (코드 포인트 목록, (N, *layout_shape) 패킹 배열)을 반환합니다.
+    주석을 정규식 한 번으로 지운 뒤 남은 16진수 전체를 bytes.fromhex 한 번으로 변환하므로
+    줄·토큰 단위의 파이썬 루프가 없습니다. 각 글리프 줄에는 코드 포인트 주석이 있어야 합니다.
+    """
+    with open(filename, "rb") as f:
+        text = f.read()
+    with stage("parse.table"):
+        codepoints = [int(cp, 16) for cp in CODEPOINT_PATTERN.findall(text)]
+        hex_text = COMMENT_PATTERN.sub(b"", text).replace(b"0x", b"").replace(b",", b" ")
+        data = np.frombuffer(bytes.fromhex(hex_text.decode("ascii")), dtype=np.uint8)
+
+    shape = layout_shape(width, height, layout)
+    glyph_size = shape[0] * shape[1]
+    if len(data) != len(codepoints) * glyph_size:
+        raise ValueError(
+            f"{filename}: 바이트 수({len(data)})가 글리프 수({len(codepoints)}) × "
+            f"글리프 크기({glyph_size})와 맞지 않습니다"
+        )
+    return codepoints, data.reshape((len(codepoints),) + shape)
+
+
+def load_component_bitmap_file(filename, width, height):
+    """
+    파일 내 각 줄의 데이터를 파싱하여 해당 구성요소(초성, 중성, 종성)를
+    키(문자)와 2D numpy 배열(비트맵)로 구성한 딕셔너리를 반환합니다.
+    같은 이름의 바이너리 테이블(.bin)이 텍스트보다 오래되지 않았으면 텍스트 대신 mmap으로 읽습니다.
+    """
+    table_filename = fresh_table(filename)
+    if table_filename is not None:
+        with GlyphTableReader(table_filename) as table:
+            return {char: bitmap for char, bitmap in table.items(unpack=True)}
+
+    codepoints, packed = load_bitmap_table(filename, width, height)
+    bitmaps = np.unpackbits(packed, axis=-1, count=width)
+    return {chr(cp): bitmap for cp, bitmap in zip(codepoints, bitmaps)}
+
+
+def decompose_hangul(syllable):
+    """
+    완성형 한글 음절을 초성, 중성, 종성(종성 없으면 None)으로 분해합니다.
+    Unicode 공식 분해 규칙을 따릅니다.
+    """
+    code = ord(syllable) - HANGUL_BASE
+    if code < 0 or code > HANGUL_COUNT - 1:
+        return None
+    choseong_index = code // (JUNGSEONG_COUNT * JONGSEONG_COUNT)
+    jungseong_index = (code % (JUNGSEONG_COUNT * JONGSEONG_COUNT)) // JONGSEONG_COUNT
+    jongseong_index = code % JONGSEONG_COUNT
+    choseong = chr(0x1100 + choseong_index)
+    jungseong = chr(0x1161 + jungseong_index)
+    jongseong = None
+    if jongseong_index != 0:
+        jongseong = chr(0x11A7 + jongseong_index)  # 첫 종성: U+11A8
+    return choseong, jungseong, jongseong
+
+
+def shift_bitmap(bitmap, dx, dy):
+    """
+    bitmap을 (dx, dy) 만큼 평행이동(시프트)한 새로운 배열을 반환합니다.
+    빈 영역은 0(배경)으로 채웁니다.
+    """
+    h, w = bitmap.shape
+    new_img = np.zeros_like(bitmap)
+    # X 방향
+    if dx >= 0:
+        src_x_start, dst_x_start = 0, dx
+        src_x_end, dst_x_end = w - dx, w
+    else:
+        src_x_start, dst_x_start = -dx, 0
+        src_x_end, dst_x_end = w, w + dx
+    # Y 방향
+    if dy >= 0:
+        src_y_start, dst_y_start = 0, dy
+        src_y_end, dst_y_end = h - dy, h
+    else:
+        src_y_start, dst_y_start = -dy, 0
+        src_y_end, dst_y_end = h, h + dy
+
+    new_img[dst_y_start:dst_y_end, dst_x_start:dst_x_end] = bitmap[
+        src_y_start:src_y_end, src_x_start:src_x_end
+    ]
+    return new_img
+
+
+def composition_offsets(jung, width, height):
+    """
+    구성요소의 위치 오프셋 (픽셀 단위)을 (초성, 중성, 종성) 순서로 반환합니다.
+    아래 값들은 필요에 따라 미세 조정할 수 있습니다.
+    """
+    offset_initial = (0, 0)  # 초성: 좌측 상단
+    offset_jung = (width // 8, 0)  # 중성: 우측 상단 (대략)
+    if jung in HORIZONTAL_JUNGSEONG:
+        offset_jung = (width // 4, 0)  # 중성: 우측 상단 (대략)
+    offset_jong = (width // 4, height - height // 3)  # 종성: 하단 중앙
+    return offset_initial, offset_jung, offset_jong
+
+
+def syllable_indices(codepoints):
+    """
+    코드 포인트 배열을 (초성, 중성, 종성) 인덱스 배열로 한 번에 분해합니다.
+    한글 음절이 아닌 문자는 빈 칸 인덱스(초성·중성은 마지막 칸, 종성은 0)가 됩니다.
+    """
+    code = np.asarray(codepoints, dtype=np.int64) - HANGUL_BASE
+    valid = (code >= 0) & (code < HANGUL_COUNT)
+    code = np.where(valid, code, 0)
+    cho = np.where(valid, code // (JUNGSEONG_COUNT * JONGSEONG_COUNT), CHOSEONG_COUNT)
+    jung = np.where(
+        valid,
+        (code % (JUNGSEONG_COUNT * JONGSEONG_COUNT)) // JONGSEONG_COUNT,
+        JUNGSEONG_COUNT,
+    )
+    jong = np.where(valid, code % JONGSEONG_COUNT, 0)
+    return cho, jung, jong
+
+
+def layout_text(lines, columns=None, blank=" "):
+    """
+    문자열(또는 문자열 이터러블)을 줄 단위로 배치한 (줄 수, columns) 코드 포인트 배열을 반환합니다.
+    각 문자열의 "\n"은 줄바꿈으로, columns를 넘는 줄은 다음 줄로 자동 줄바꿈합니다.
+    columns를 생략하면 가장 긴 줄의 길이가 됩니다. 빈 칸은 blank 문자로 채웁니다.
+    """
+    if isinstance(lines, str):
+        lines = [lines]
+    rows = []
+    for line in lines:
+        for part in line.split("\n"):
+            if columns:
+                starts = range(0, max(len(part), 1), columns)
+                rows.extend(part[i : i + columns] for i in starts)
+            else:
+                rows.append(part)
+    if not columns:
+        columns = max((len(row) for row in rows), default=0)
+    grid = np.full((len(rows), columns), ord(blank), dtype=np.int64)
+    for r, row in enumerate(rows):
+        grid[r, : len(row)] = [ord(ch) for ch in row]
+    return grid
+
+
+class ComposedGlyphCache:
+    """
+    합성된 음절 글리프를 담아 두는 크기 제한 LRU 캐시입니다.
+
+    키는 (아틀라스 digest, 음절)입니다. digest는 오프셋이 적용된 컴포넌트 표의 해시이므로
+    크기·오프셋 프로필·컴포넌트 비트맵이 모두 반영됩니다. 같은 크기의 아틀라스가 다른
+    컴포넌트로 다시 만들어지면 register()에서 이전 digest의 글리프를 모두 버립니다.
+    hits / misses / evictions / invalidations 카운터로 효율을 확인할 수 있습니다.
+    """
+
+    def __init__(self, maxsize=COMPOSED_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._glyphs = OrderedDict()
+        self._digests = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def register(self, width, height, digest):
+        """(width, height) 크기의 현재 아틀라스 digest를 등록하고, 바뀌었으면 이전 글리프를 버립니다."""
+        old = self._digests.get((width, height))
+        self._digests[(width, height)] = digest
+        if old is None or old == digest:
+            return
+        stale = [key for key in self._glyphs if key[0] == old]
+        for key in stale:
+            del self._glyphs[key]
+        self.invalidations += len(stale)
+
+    def get(self, digest, syllable, compose):
+        """캐시된 글리프를 반환하고, 없으면 compose(syllable)로 만들어 저장합니다."""
+        key = (digest, syllable)
+        glyph = self._glyphs.get(key)
+        if glyph is not None:
+            self._glyphs.move_to_end(key)
+            self.hits += 1
+            return glyph
+        self.misses += 1
+        glyph = compose(syllable)
+        # 캐시된 배열을 호출한 쪽에서 고치지 못하도록 읽기 전용으로 보관
+        glyph.setflags(write=False)
+        self._glyphs[key] = glyph
+        if len(self._glyphs) > self.maxsize:
+            self._glyphs.popitem(last=False)
+            self.evictions += 1
+        return glyph
+
+    def stats(self):
+        """캐시 크기와 카운터를 딕셔너리로 반환합니다."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._glyphs),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """캐시된 글리프와 카운터를 모두 비웁니다."""
+        self._glyphs.clear()
+        self._digests.clear()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+# CompositionAtlas가 따로 캐시를 받지 않으면 함께 쓰는 기본 캐시
+composed_glyph_cache = ComposedGlyphCache()
+
+
+class CompositionAtlas:
+    """
+    초성·중성·종성 비트맵을 합성 위치로 미리 이동(시프트)한 뒤 행 단위로 패킹해 둔 아틀라스입니다.
+    음절 합성은 패킹된 행에 대한 비트 OR 두 번, 문자열 합성은 인덱스 gather 한 번으로 끝납니다.
+
+    comp_dicts는 load_component_bitmap_file이 반환하는
+    {"choseong": {...}, "jungseong": {...}, "jongseong": {...}} 형식입니다.
+    """
+
+    def __init__(self, comp_dicts, width, height, cache=None):
+        self.width = width
+        self.height = height
+        self.bytes_per_row = (width + 7) // 8
+        self._syllable_bitmaps = None
+        self.cache = composed_glyph_cache if cache is None else cache
+
+        # 초성·중성은 마지막 칸, 종성은 0번 칸이 빈 글리프입니다.
+        self.choseong = self._build(
+            comp_dicts["choseong"],
+            [chr(0x1100 + i) for i in range(CHOSEONG_COUNT)] + [None],
+            0,
+        )
+        self.jungseong = self._build(
+            comp_dicts["jungseong"],
+            [chr(0x1161 + i) for i in range(JUNGSEONG_COUNT)] + [None],
+            1,
+        )
+        self.jongseong = self._build(
+            comp_dicts["jongseong"],
+            [None] + [chr(0x11A7 + i) for i in range(1, JONGSEONG_COUNT)],
+            2,
+        )
+
+        # 오프셋 적용 후의 컴포넌트 표 해시 (크기·오프셋·컴포넌트 비트맵이 바뀌면 달라짐)
+        digest = hashlib.sha1(f"{width}x{height}".encode())
+        for table in (self.choseong, self.jungseong, self.jongseong):
+            digest.update(table.tobytes())
+        self.digest = digest.hexdigest()
+        self.cache.register(width, height, self.digest)
+
+    def _build(self, comp_dict, jamo_list, position):
+        """jamo_list 순서대로 (오프셋 적용 후) 패킹된 (N, H, 행당 바이트 수) 배열을 만듭니다."""
+        blank = np.zeros((self.height, self.width), dtype=np.uint8)
+        bitmaps = []
+        for jamo in jamo_list:
+            bitmap = comp_dict.get(jamo, blank) if jamo is not None else blank
+            dx, dy = composition_offsets(jamo, self.width, self.height)[position]
+            bitmaps.append(shift_bitmap(bitmap, dx, dy))
+        return np.packbits(np.stack(bitmaps), axis=-1)
+
+    def compose_packed(self, syllable, out=None):
+        """
+        한 음절을 합성하여 (H, 행당 바이트 수) 패킹 배열로 반환합니다.
+        out을 넘기면 새 배열을 할당하지 않고 그 버퍼에 기록합니다.
+        """
+        code = ord(syllable) - HANGUL_BASE
+        if 0 <= code < HANGUL_COUNT:
+            cho, rest = divmod(code, JUNGSEONG_COUNT * JONGSEONG_COUNT)
+            jung, jong = divmod(rest, JONGSEONG_COUNT)
+        else:
+            cho, jung, jong = CHOSEONG_COUNT, JUNGSEONG_COUNT, 0
+        if out is None:
+            out = np.empty((self.height, self.bytes_per_row), dtype=np.uint8)
+        np.bitwise_or(self.choseong[cho], self.jungseong[jung], out=out)
+        np.bitwise_or(out, self.jongseong[jong], out=out)
+        return out
+
+    def compose_codepoints_packed(self, codepoints):
+        """
+        코드 포인트 배열 전체를 인덱스 gather와 브로드캐스트 OR로 한 번에 합성하여
+        (N, H, 행당 바이트 수) 배열로 반환합니다.
+        """
+        with stage("compose.batch"):
+            cho, jung, jong = syllable_indices(codepoints)
+            packed = self.choseong[cho]
+            packed |= self.jungseong[jung]
+            packed |= self.jongseong[jong]
+        count("glyphs.composed", len(packed))
+        return packed
+
+    def compose_string_packed(self, text):
+        """문자열 전체를 gather 한 번으로 합성하여 (N, H, 행당 바이트 수) 배열로 반환합니다."""
+        return self.compose_codepoints_packed([ord(ch) for ch in text])
+
+    def compose(self, syllable):
+        """한 음절을 합성하여 (H, W) 비트맵(1=글자, 0=배경)으로 반환합니다."""
+        return np.unpackbits(self.compose_packed(syllable), axis=-1, count=self.width)
+
+    def glyph(self, syllable):
+        """
+        compose와 같은 (H, W) 비트맵을 LRU 캐시를 거쳐 반환합니다. (읽기 전용 배열)
+        자주 쓰는 음절은 다시 합성하지 않고 캐시에서 바로 가져옵니다.
+        """
+        return self.cache.get(self.digest, syllable, self.compose)
+
+    def compose_string(self, text):
+        """
+        문자열의 각 음절을 합성하여 좌우로 이어붙인 (H, W × 글자 수) 비트맵을 반환합니다.
+        preview.composite_string과 같은 결과입니다.
+        """
+        packed = self.compose_string_packed(text)
+        bitmaps = np.unpackbits(packed, axis=-1, count=self.width)
+        return bitmaps.transpose(1, 0, 2).reshape(self.height, -1)
+
+    def syllable_bitmaps(self):
+        """
+        완성형 음절 11,172자 + 빈 글리프(마지막 칸)를 미리 합성해 둔 (N, H, W) 비트맵 표입니다.
+        render_lines가 처음 호출될 때 한 번만 만듭니다. (24×24 기준 약 6.4MB)
+        """
+        if self._syllable_bitmaps is None:
+            codepoints = np.arange(HANGUL_BASE, HANGUL_BASE + HANGUL_COUNT + 1)
+            packed = self.compose_codepoints_packed(codepoints)
+            self._syllable_bitmaps = np.unpackbits(packed, axis=-1, count=self.width)
+        return self._syllable_bitmaps
+
+    def render_lines(self, lines, columns=None, fallback=None, out=None):
+        """
+        문자열(또는 문자열 이터러블)을 줄 단위로 배치하여 (줄 수 × H, columns × W) 비트맵
+        (1=글자, 0=배경)으로 합성합니다. 줄바꿈 규칙은 layout_text와 같습니다.
+
+        출력 크기를 먼저 계산해 버퍼를 한 번만 할당하고(out을 넘기면 그 버퍼를 재사용),
+        모든 글자를 미리 합성된 음절 표에서 np.take 한 번으로 버퍼에 바로 기록합니다.
+        한글 음절이 아닌 문자는 빈 칸이 되며, fallback({문자: (H, W) 비트맵})에 있는 문자는
+        그 비트맵으로 채웁니다.
+        """
+        grid = layout_text(lines, columns)
+        rows, columns = grid.shape
+        shape = (rows * self.height, columns * self.width)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+            raise ValueError(f"출력 버퍼는 {shape} 크기의 연속된 uint8 배열이어야 합니다")
+
+        # (줄, H, 칸, W) 버퍼를 (줄, 칸, H, W) 뷰로 보고 글리프 단위로 채움
+        cells = out.reshape(rows, self.height, columns, self.width).transpose(0, 2, 1, 3)
+        code = grid - HANGUL_BASE
+        index = np.where((code >= 0) & (code < HANGUL_COUNT), code, HANGUL_COUNT)
+        table = self.syllable_bitmaps()
+        with stage("compose.render_lines"):
+            np.take(table, index, axis=0, out=cells, mode="clip")
+        count("glyphs.composed", grid.size)
+
+        if fallback:
+            for ch, bitmap in fallback.items():
+                cells[grid == ord(ch)] = bitmap
+        return out
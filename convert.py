@@ -1,5 +1,20 @@
-from PIL import Image, ImageFont, ImageDraw
-import numpy as np
+import argparse
+from contextlib import ExitStack
+
+from bitpack import LAYOUTS, pack_bitmap, pack_glyphs
+from compose import CompositionAtlas, load_component_bitmap_file
+from fonttable import GlyphDeduplicator, GlyphTableWriter, format_dedup_stats
+from glyph_cache import GlyphCache
+from glyph_codec import CompressedTableWriter
+from glyph_metrics import RENDERER_VERSION, render_glyphs
+from instrument import (
+    PoolTask,
+    count,
+    merge_pool_results,
+    profile_run,
+    stage,
+    worker_pool,
+)
 
 # 사용할 폰트 및 크기 설정
 font_paths = {
@@ -8,66 +23,222 @@ font_paths = {
     24: "font/DOSGothic.ttf",
 }
 
+sizes = [10, 16, 24]
 
-def generate_complete_bitmap(hangul_char, size):
+# 병렬 렌더링 시 한 작업(worker 호출)에 넘길 음절 수
+chunk_size = 256
+
+
+def render_box(size):
+    """음절을 중앙 정렬할 영역입니다. (전체 영역)"""
+    return (0, 0, size, size)
+
+
+def render_params(size):
+    """
+    render_complete_chunk의 결과에 영향을 주는 렌더링 파라미터입니다. (글리프 캐시 키에 사용)
+    실제로 렌더러에 넘기는 정렬 영역과 렌더러·Pillow 버전으로 만들므로,
+    이 중 하나가 바뀌면 캐시가 자동으로 무효화됩니다. (폰트 파일은 캐시 키에 따로 들어감)
+    """
+    import PIL
+
+    return {
+        "renderer": RENDERER_VERSION,
+        "box": render_box(size),
+        "align": "center",
+        "pillow": PIL.__version__,
+    }
+
+
+def render_complete_bitmap(hangul_char, size, font_path=None):
     """
     완성형 한글 음절을 주어진 size의 비트맵 이미지에
     전체 영역(0, 0, size, size)에 중앙 정렬하여 렌더링한 후,
-    OLED에 출력할 바이트 배열로 변환합니다.
+    1비트 numpy 배열(0=검정 글자, 1=흰 배경)로 반환합니다.
+    font_path를 생략하면 font_paths[size]의 폰트를 사용합니다.
+    바운딩 박스는 (폰트, 크기)마다 한 번만 구해 glyph_metrics 표에 보관합니다.
+    """
+    return render_glyphs(
+        font_path or font_paths[size], size, [hangul_char], render_box(size)
+    )[0]
+
+
+def generate_complete_bitmap(hangul_char, size):
+    """
+    완성형 한글 음절을 렌더링하여 OLED에 출력할 바이트 배열로 변환합니다.
+    """
+    return pack_bitmap(render_complete_bitmap(hangul_char, size))
+
+
+def render_complete_chunk(task):
     """
-    font = ImageFont.truetype(font_paths[size], size)
-    # 1비트 흰색 배경 이미지 생성
-    img = Image.new("1", (size, size), 1)
-    draw = ImageDraw.Draw(img)
-
-    # 폰트에서 해당 음절의 바운딩 박스를 구함
-    bbox = font.getbbox(hangul_char)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    # 음수 오프셋 보정
-    base_x = -bbox[0]
-    base_y = -bbox[1]
-
-    # 전체 영역 (0,0,size,size) 내에서 중앙 정렬
-    x_offset = base_x + (size - text_width) // 2
-    y_offset = base_y + (size - text_height) // 2
-    draw.text((x_offset, y_offset), hangul_char, font=font, fill=0)
-
-    # 이미지를 1비트 numpy 배열로 변환
-    bitmap = np.array(img, dtype=np.uint8)
-    byte_array = []
-    for row in bitmap:
-        byte_value = 0
-        for i, pixel in enumerate(row):
-            if pixel == 0:  # 픽셀이 검정이면
-                byte_value |= 1 << (7 - (i % 8))
-            if i % 8 == 7:
-                byte_array.append(byte_value)
-                byte_value = 0
-        if len(row) % 8 != 0:
-            byte_array.append(byte_value)
-    return byte_array
-
-
-# 예제로 완성형 한글 음절 중 일부만 생성 (전체 범위는 U+AC00~U+D7A3)
-# 주의: 전체 11,172자는 생성하기에는 많으므로, 여기서는 처음 100개 음절만 사용합니다.
-hangul_chars = [chr(i) for i in range(0xAC00, 0xAC00 + 11172)]
-
-# 크기별(10, 16, 24)로 각 음절의 비트맵 데이터를 생성
-complete_bitmap_data = {size: {} for size in [10, 16, 24]}
-for size in [10, 16, 24]:
-    for char in hangul_chars:
-        complete_bitmap_data[size][char] = generate_complete_bitmap(char, size)
-
-
-def save_complete_bitmap_to_file(filename, size):
+    (음절 목록, size) 작업 하나를 렌더링하여 (N, H, 행당 바이트 수) 패킹 배열로 반환합니다.
+    프로세스 풀의 worker에서 호출되며, 폰트 핸들과 바운딩 박스 표는 worker마다 캐시에 유지됩니다.
+    """
+    chars, size = task
+    bitmaps = render_glyphs(font_paths[size], size, chars, render_box(size))
+    with stage("pack"):
+        return pack_glyphs(bitmaps)
+
+
+def iter_complete_glyphs(hangul_chars, size, pool=None, cache=None):
+    """
+    음절을 chunk_size 단위로 렌더링·패킹하면서 (문자, 패킹된 글리프) 쌍을 순서대로 내보냅니다.
+    전체 결과를 메모리에 모아 두지 않으므로 음절 수나 크기에 관계없이 메모리 사용량이 일정합니다.
+    pool(instrument.worker_pool로 만든 풀)이 주어지면 각 청크를 프로세스 풀에서 렌더링하고,
+    결과는 유니코드 순서대로 병합합니다. worker에서 측정한 단계별 시간·카운터도 청크마다 받아 합칩니다.
+    cache(GlyphCache)가 주어지면 입력이 바뀌지 않은 글리프는 캐시에서 가져오고
+    나머지만 렌더링합니다.
+    """
+    if cache is not None:
+        yield from cache.iter_glyphs(
+            font_paths[size],
+            size,
+            render_params(size),
+            hangul_chars,
+            lambda missing: iter_complete_glyphs(missing, size, pool),
+        )
+        return
+
+    tasks = (
+        (hangul_chars[i : i + chunk_size], size)
+        for i in range(0, len(hangul_chars), chunk_size)
+    )
+    if pool is not None:
+        results = merge_pool_results(pool.imap(PoolTask(render_complete_chunk), tasks))
+    else:
+        results = map(render_complete_chunk, tasks)
+
+    for packed, start in zip(results, range(0, len(hangul_chars), chunk_size)):
+        chars = hangul_chars[start : start + chunk_size]
+        for char, glyph in zip(chars, packed):
+            yield char, glyph.reshape(-1)
+
+
+def iter_composed_glyphs(hangul_chars, size):
+    """
+    FreeType 렌더링 없이 초성·중성·종성 테이블(hangul_{size}x{size}_*.txt)만으로
+    음절을 합성하여 (문자, 패킹된 글리프) 쌍을 순서대로 내보냅니다.
+    모든 음절은 인덱스 배열에 대한 브로드캐스트 OR 한 번으로 합성됩니다.
+    """
+    comp_dicts = {
+        component: load_component_bitmap_file(
+            f"hangul_{size}x{size}_{component}.txt", size, size
+        )
+        for component in ["choseong", "jungseong", "jongseong"]
+    }
+    atlas = CompositionAtlas(comp_dicts, size, size)
+    packed = atlas.compose_codepoints_packed([ord(char) for char in hangul_chars])
+    for char, glyph in zip(hangul_chars, packed):
+        yield char, glyph.reshape(-1)
+
+
+def save_complete_bitmap_to_file(filename, glyphs, *sinks):
+    """
+    (문자, 바이트 배열) 쌍을 받는 대로 한 줄씩 C 배열 형식으로 파일에 기록합니다.
+    sinks(GlyphTableWriter, CompressedTableWriter, GlyphDeduplicator 등 add(char, data)를
+    가진 객체)가 주어지면 같은 글리프를 각각에도 함께 넘깁니다. (None은 건너뜀)
+    """
+    sinks = [sink for sink in sinks if sink is not None]
     with open(filename, "w", encoding="utf-8") as file:
-        for char, data in complete_bitmap_data[size].items():
-            hex_data = ", ".join(f"0x{byte:02X}" for byte in data)
-            char_info = f"{char} (U+{ord(char):04X})"
-            file.write(f"    {hex_data}, // {char_info}\n")
+        for char, data in glyphs:
+            with stage("write.sinks"):
+                for sink in sinks:
+                    sink.add(char, data)
+            with stage("write.text"):
+                hex_data = ", ".join(f"0x{byte:02X}" for byte in data)
+                char_info = f"{char} (U+{ord(char):04X})"
+                file.write(f"    {hex_data}, // {char_info}\n")
+            count("glyphs.written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="완성형 한글 비트맵 폰트 테이블 생성")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="렌더링에 사용할 프로세스 수 (기본값: 1)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["render", "compose"],
+        default="render",
+        help="render: 폰트로 음절을 렌더링, compose: 초성·중성·종성 테이블로 합성 (기본값: render)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="렌더링된 글리프 캐시 디렉토리 (지정하면 입력이 바뀐 글리프만 다시 렌더링)",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="같은 비트맵을 하나로 모은 풀(_pool.txt)과 인덱스 표(_index.txt)도 함께 생성",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="바운딩 박스로 잘라 비트 단위로 패킹한 압축 테이블(.hgc)도 함께 생성",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="row_msb",
+        help="바이너리 테이블(.bin)의 바이트 레이아웃: row_msb(기본값), row_lsb, "
+        "page(SSD1306/SH1106 세로 8픽셀 페이지). 텍스트·압축 테이블은 항상 row_msb",
+    )
+    parser.add_argument(
+        "--profile",
+        help="단계별 시간·카운터·캐시 적중률을 기록할 파일 (.json이면 JSON, -면 표준 출력)",
+    )
+    args = parser.parse_args()
+
+    # 완성형 한글 음절 전체 범위 (U+AC00~U+D7A3, 11,172자)
+    hangul_chars = [chr(i) for i in range(0xAC00, 0xAC00 + 11172)]
+
+    with profile_run(args.profile):
+        pool = worker_pool(args.jobs) if args.jobs > 1 and args.mode == "render" else None
+        cache = GlyphCache(args.cache_dir) if args.cache_dir else None
+        try:
+            # 크기별(10, 16, 24)로 렌더링(또는 합성)과 동시에 파일에 기록
+            for size in sizes:
+                if args.mode == "compose":
+                    glyphs = iter_composed_glyphs(hangul_chars, size)
+                else:
+                    glyphs = iter_complete_glyphs(hangul_chars, size, pool, cache)
+                dedup = GlyphDeduplicator() if args.dedup else None
+                with ExitStack() as stack:
+                    sinks = [
+                        stack.enter_context(
+                            GlyphTableWriter(
+                                f"hangul_complete_{size}x{size}.bin",
+                                size,
+                                size,
+                                args.layout,
+                            )
+                        ),
+                        dedup,
+                    ]
+                    if args.compress:
+                        sinks.append(
+                            stack.enter_context(
+                                CompressedTableWriter(
+                                    f"hangul_complete_{size}x{size}.hgc", size, size
+                                )
+                            )
+                        )
+                    save_complete_bitmap_to_file(
+                        f"hangul_complete_{size}x{size}.txt", glyphs, *sinks
+                    )
+                if dedup is not None:
+                    stats = dedup.save(f"hangul_complete_{size}x{size}")
+                    print(format_dedup_stats(f"hangul_complete_{size}x{size}", stats))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
 
-# 파일 저장 (크기별)
-for size in [10, 16, 24]:
-    save_complete_bitmap_to_file(f"hangul_complete_{size}x{size}.txt", size)
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
-from PIL import Image, ImageFont, ImageDraw
 import os
 
+import numpy as np
+
+from bitpack import apply_mask, compile_mask, pack_glyphs
+from bmp_export import save_bmp_atlas, save_bmp_files
+from convert import render_box, render_params
+from glyph_cache import GlyphCache
+from glyph_metrics import render_glyphs
+from instrument import profile_run, stage
+
 # 사용할 폰트 및 크기 설정
 font_paths = {
     10: "font/NotoSansMonoCJKkr-Regular.otf",
@@ -11,34 +19,16 @@ font_paths = {
 
 def generate_component_bitmap(component, size, mask_region=None):
     """
-    단일 컴포넌트를 주어진 size의 1비트 비트맵 이미지에 중앙 정렬하여 그린다.
-    만약 mask_region이 지정되면, 해당 영역(튜플: (x0, y0, x1, y1))을 하얀색(배경색)으로 채운다.
+    단일 컴포넌트를 주어진 size의 1비트 비트맵에 중앙 정렬하여 그린 뒤
+    (H, 행당 바이트 수) 패킹 배열로 반환한다.
+    mask_region이 지정되면 main()과 같이 compile_mask로 만든 마스크를 적용한다.
+    (사각형 (x0, y0, x1, y1)과 1비트 스텐실 이미지를 모두 사용할 수 있음)
     """
-    font = ImageFont.truetype(font_paths[size], size)
-    # 1비트 흰색 배경 이미지 생성 (모드 "1": 0은 검정, 1은 흰색)
-    img = Image.new("1", (size, size), 1)
-    draw = ImageDraw.Draw(img)
-
-    # 폰트의 바운딩 박스 계산 (x0, y0, x1, y1)
-    bbox = font.getbbox(component)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-
-    # 폰트의 음수 오프셋 보정 후 중앙 정렬 좌표 계산
-    base_x = -bbox[0]
-    base_y = -bbox[1]
-    x_offset = base_x + (size - text_width) // 2
-    y_offset = base_y + (size - text_height) // 2
-
-    # 텍스트 렌더링 (검은색: fill=0)
-    draw.text((x_offset, y_offset), component, font=font, fill=0)
-
-    # 사용자가 지정한 영역 마스킹 (하얀색으로 채움)
-    if mask_region:
-        for mask in mask_region:
-            draw.rectangle(mask, fill=1)
-
-    return img
+    bitmaps = render_glyphs(font_paths[size], size, [component])
+    with stage("pack"):
+        packed = pack_glyphs(bitmaps)[0]
+    with stage("mask"):
+        return apply_mask(packed, compile_mask(mask_region, size, size))
 
 
 # ==========================================================
@@ -110,6 +100,8 @@ sizes = [10, 16, 24]
 # 아래 예시에서는 크기별로 마스킹 영역을 지정할 수 있습니다.
 # mask_region은 (x0, y0, x1, y1) 형태입니다.
 # 예를 들어, 크기 16인 경우 상단 4픽셀을 마스킹하려면 (0, 0, 16, 4)로 지정합니다.
+# 사각형 대신 1비트 스텐실 이미지(검정 영역을 지움)를 넣을 수도 있습니다.
+# 예: Image.open("mask_16.bmp").convert("1")
 mask_region_for_size = {
     10: (
         (0, 0, 10, 4),
@@ -125,31 +117,76 @@ mask_region_for_size = {
     ),  # 크기 24는 마스킹 없이 렌더링 (원하는 경우 변경 가능)
 }
 
-component_bitmap_data = {size: {} for size in sizes}
-for size in sizes:
-    mask = mask_region_for_size.get(size)  # 해당 크기에 맞는 마스킹 영역 (없으면 None)
-    component_bitmap_data[size] = {
-        char: generate_component_bitmap(char, size, mask_region=mask)
-        for char in unicode_list
-    }
 
+def render_component_bitmaps(size, cache=None):
+    """
+    unicode_list의 글자를 마스킹 없이 렌더링하여
+    (N, H, 행당 바이트 수) 패킹 배열로 반환한다. (unicode_list 순서)
+    cache(GlyphCache)가 주어지면 마스크를 뺀 렌더링 파라미터로 캐시를 찾으므로,
+    마스크만 바꿔 다시 실행할 때는 렌더링 없이 캐시된 글리프를 그대로 쓴다.
+    """
+
+    def render(chars):
+        bitmaps = render_glyphs(font_paths[size], size, chars, render_box(size))
+        with stage("pack"):
+            return zip(chars, pack_glyphs(bitmaps))
+
+    if cache is None:
+        return np.stack([glyph for _, glyph in render(unicode_list)])
+    glyphs = cache.iter_glyphs(
+        font_paths[size], size, render_params(size), unicode_list, render
+    )
+    return np.stack([glyph.reshape(size, -1) for _, glyph in glyphs])
 
-def save_component_bitmap_image(size, output_dir):
+
+def save_component_bitmap_image(size, output_dir, packed):
     """
-    component_bitmap_data에 저장된 PIL 이미지 객체를 BMP 파일로 저장한다.
+    패킹 배열을 BMP 파일로 저장한다.
     파일명 형식: unicode_{size}x{size}_{유니코드코드값}.bmp
     """
+    save_bmp_files(output_dir, size, unicode_list, packed)
+
+
+def save_component_bitmap_atlas(size, output_dir, packed):
+    """
+    패킹 배열의 글리프를 스프라이트 시트 한 장(unicode_{size}x{size}_atlas.bmp)과
+    좌표 인덱스(unicode_{size}x{size}_atlas.json)로 저장한다.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    for char, image in component_bitmap_data[size].items():
-        filename = f"unicode_{size}x{size}_{char}.bmp"
-        filepath = os.path.join(output_dir, filename)
-        image.save(filepath, format="BMP")
+    filepath = os.path.join(output_dir, f"unicode_{size}x{size}_atlas.bmp")
+    save_bmp_atlas(filepath, size, unicode_list, packed)
 
 
 # ==========================================================
 # BMP 이미지 저장 경로 설정 (원하는 폴더로 변경 가능)
 output_directory = "bmp_output"
 
-# 각 크기별 BMP 파일 저장
-for size in sizes:
-    save_component_bitmap_image(size, output_directory)
+# 저장 방식: "files"는 글자마다 BMP 파일 하나, "atlas"는 크기별 스프라이트 시트 한 장
+output_mode = "files"
+
+# 렌더링된 글리프 캐시 디렉토리 (None이면 매번 다시 렌더링)
+# 캐시 키에 마스크가 들어가지 않으므로 mask_region_for_size만 바꾼 재실행은 렌더링을 건너뜁니다.
+glyph_cache_dir = "glyph_cache"
+
+
+def main():
+    cache = GlyphCache(glyph_cache_dir) if glyph_cache_dir else None
+    for size in sizes:
+        # 마스킹 영역을 크기별로 한 번만 비트 마스크로 변환한 뒤, 렌더링 결과 전체에 비트 AND로 적용
+        # (마스크만 바꿀 때는 렌더링 결과를 글리프 캐시에서 가져오고 이 단계만 다시 실행됩니다)
+        mask = compile_mask(mask_region_for_size.get(size), size, size)
+        packed = render_component_bitmaps(size, cache)
+        with stage("mask"):
+            packed = apply_mask(packed, mask)
+
+        # 각 크기별 BMP 파일 저장
+        with stage("write.bmp"):
+            if output_mode == "atlas":
+                save_component_bitmap_atlas(size, output_directory, packed)
+            else:
+                save_component_bitmap_image(size, output_directory, packed)
+
+
+if __name__ == "__main__":
+    with profile_run():
+        main()
@@ -1,5 +1,11 @@
-from PIL import Image, ImageFont, ImageDraw
-import numpy as np
+from contextlib import ExitStack
+
+from bitpack import pack_bitmap, pack_glyphs
+from convert import chunk_size, save_complete_bitmap_to_file
+from fonttable import GlyphDeduplicator, GlyphTableWriter, format_dedup_stats
+from glyph_codec import CompressedTableWriter
+from glyph_metrics import render_glyphs
+from instrument import profile_run, stage
 
 # 사용할 폰트 및 크기 설정
 font_paths = {
@@ -14,57 +20,69 @@ def generate_complete_bitmap(hangul_char, size):
     전체 영역(0, 0, size, size) 내에서 중앙 정렬로 렌더링한 후,  
     OLED에 출력할 바이트 배열로 변환합니다.
     """
-    font = ImageFont.truetype(font_paths[size], size)
-    # 1비트 흰색 배경 이미지 생성
-    img = Image.new("1", (size, size), 1)
-    draw = ImageDraw.Draw(img)
-    
-    # 해당 음절의 바운딩 박스 및 실제 텍스트 크기 계산
-    bbox = font.getbbox(hangul_char)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    # 음수 오프셋 보정
-    base_x = -bbox[0]
-    base_y = -bbox[1]
-    
-    # 전체 영역 내 중앙 정렬
-    x_offset = base_x + (size - text_width) // 2
-    y_offset = base_y + (size - text_height) // 2
-    draw.text((x_offset, y_offset), hangul_char, font=font, fill=0)
-    
-    # 이미지를 1비트 numpy 배열로 변환한 후 바이트 배열로 전환
-    bitmap = np.array(img, dtype=np.uint8)
-    byte_array = []
-    for row in bitmap:
-        byte_value = 0
-        for i, pixel in enumerate(row):
-            if pixel == 0:
-                byte_value |= 1 << (7 - (i % 8))
-            if i % 8 == 7:
-                byte_array.append(byte_value)
-                byte_value = 0
-        if len(row) % 8 != 0:
-            byte_array.append(byte_value)
-    return byte_array
+    return pack_bitmap(render_glyphs(font_paths[size], size, [hangul_char])[0])
+
+
+def iter_complete_glyphs(hangul_chars, size):
+    """
+    음절을 chunk_size개씩 한 번에 렌더링·패킹하면서 (문자, 바이트 배열) 쌍을 순서대로 내보냅니다.
+    바운딩 박스는 묶음마다 한 번에 구해 (폰트, 크기)별 표에 보관합니다.
+    """
+    for start in range(0, len(hangul_chars), chunk_size):
+        chars = hangul_chars[start : start + chunk_size]
+        bitmaps = render_glyphs(font_paths[size], size, chars)
+        with stage("pack"):
+            packed = pack_glyphs(bitmaps)
+        for char, data in zip(chars, packed):
+            yield char, data.reshape(-1)
+
+# dedup_output이 True면 중복을 제거한 비트맵 풀과 인덱스 표도 함께 만들고,
+# compressed_output이 True면 압축 테이블(.hgc)도 함께 만듭니다.
+dedup_output = False
+compressed_output = False
+# 바이너리 테이블(.bin)의 바이트 레이아웃: "row_msb"(기본값), "row_lsb", "page"(SSD1306/SH1106 세로 8픽셀 페이지)
+# (텍스트 테이블과 압축 테이블은 항상 row_msb)
+layout = "row_msb"
+
 
-# KS X 1001 현대 한글 2,350자는 별도 파일("ksx1001_hangul.txt")에 저장되어 있다고 가정합니다.
-# 파일에는 공백 없이 2,350개의 한글 음절이 연속된 문자열로 들어있습니다.
-with open("ksx1001_hangul.txt", "r", encoding="utf-8") as f:
-    hangul_chars = list(f.read().strip())
+def main():
+    # KS X 1001 현대 한글 2,350자는 별도 파일("ksx1001_hangul.txt")에 저장되어 있다고 가정합니다.
+    # 파일에는 공백 없이 2,350개의 한글 음절이 연속된 문자열로 들어있습니다.
+    with open("ksx1001_hangul.txt", "r", encoding="utf-8") as f:
+        hangul_chars = list(f.read().strip())
 
-# 각 크기별(10, 16, 24)로 완성형 음절의 비트맵 데이터를 생성합니다.
-complete_bitmap_data = {size: {} for size in [10, 16, 24]}
-for size in [10, 16, 24]:
-    for char in hangul_chars:
-        complete_bitmap_data[size][char] = generate_complete_bitmap(char, size)
+    # 크기별(10, 16, 24)로 렌더링·패킹한 음절을 바로 파일에 기록합니다.
+    # 전체 비트맵을 메모리에 모아 두지 않고 chunk_size개씩 흘려보냅니다.
+    # 같은 글리프를 코드 포인트 인덱스가 붙은 바이너리 테이블(.bin)에도 함께 기록합니다.
+    for size in [10, 16, 24]:
+        dedup = GlyphDeduplicator() if dedup_output else None
+        with ExitStack() as stack:
+            sinks = [
+                stack.enter_context(
+                    GlyphTableWriter(
+                        f"hangul_complete_{size}x{size}.bin", size, size, layout
+                    )
+                ),
+                dedup,
+            ]
+            if compressed_output:
+                sinks.append(
+                    stack.enter_context(
+                        CompressedTableWriter(
+                            f"hangul_complete_{size}x{size}.hgc", size, size
+                        )
+                    )
+                )
+            save_complete_bitmap_to_file(
+                f"hangul_complete_{size}x{size}.txt",
+                iter_complete_glyphs(hangul_chars, size),
+                *sinks,
+            )
+        if dedup is not None:
+            stats = dedup.save(f"hangul_complete_{size}x{size}")
+            print(format_dedup_stats(f"hangul_complete_{size}x{size}", stats))
 
-def save_complete_bitmap_to_file(filename, size):
-    with open(filename, "w", encoding="utf-8") as file:
-        for char, data in complete_bitmap_data[size].items():
-            hex_data = ", ".join(f"0x{byte:02X}" for byte in data)
-            char_info = f"{char} (U+{ord(char):04X})"
-            file.write(f"    {hex_data}, // {char_info}\n")
 
-# 크기별로 파일에 저장
-for size in [10, 16, 24]:
-    save_complete_bitmap_to_file(f"hangul_complete_{size}x{size}.txt", size)
+if __name__ == "__main__":
+    with profile_run():
+        main()
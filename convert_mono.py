@@ -1,5 +1,11 @@
-from PIL import Image, ImageFont, ImageDraw
-import numpy as np
+from contextlib import ExitStack
+
+from bitpack import pack_glyphs
+from convert import save_complete_bitmap_to_file
+from fonttable import GlyphDeduplicator, GlyphTableWriter, format_dedup_stats
+from glyph_codec import CompressedTableWriter
+from glyph_metrics import render_glyphs
+from instrument import profile_run, stage
 
 # 사용할 폰트 및 크기 설정
 font_paths = {
@@ -14,45 +20,20 @@ def generate_component_bitmap(component, size, component_type):
     단일 컴포넌트(초성, 중성, 종성)를 주어진 size의 비트맵 이미지에
     전체 영역(0, 0, size, size)에 중앙 정렬하여 그립니다.
     """
-    font = ImageFont.truetype(font_paths[size], size)
-    # 1비트 흰색 배경 이미지 생성
-    img = Image.new("1", (size, size), 1)
-    draw = ImageDraw.Draw(img)
+    return generate_component_bitmaps([component], size, component_type)[component]
 
-    # 텍스트의 바운딩 박스 (x0, y0, x1, y1)와 실제 텍스트 크기 계산
-    bbox = font.getbbox(component)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
 
+def generate_component_bitmaps(components, size, component_type):
+    """
+    컴포넌트 목록을 한 번에 렌더링하여 {컴포넌트 문자: 바이트 배열} 딕셔너리로 반환합니다.
+    바운딩 박스와 중앙 정렬 위치는 목록 전체에 대해 한 번에 계산합니다.
+    """
     # 전체 이미지 영역을 사용하여 중앙 정렬
     box = (0, 0, size, size)
-    box_width = box[2] - box[0]
-    box_height = box[3] - box[1]
-
-    # 폰트의 음수 오프셋 보정
-    base_x = -bbox[0]
-    base_y = -bbox[1]
-
-    # 전체 영역 내 중앙 정렬
-    x_offset = base_x + box[0] + (box_width - text_width) // 2
-    y_offset = base_y + box[1] + (box_height - text_height) // 2
-
-    draw.text((x_offset, y_offset), component, font=font, fill=0)
-
-    # 생성된 이미지의 1비트 배열을 numpy 배열로 변환 후 바이트 배열로 전환
-    bitmap = np.array(img, dtype=np.uint8)
-    byte_array = []
-    for row in bitmap:
-        byte_value = 0
-        for i, pixel in enumerate(row):
-            if pixel == 0:
-                byte_value |= 1 << (7 - (i % 8))
-            if i % 8 == 7:
-                byte_array.append(byte_value)
-                byte_value = 0
-        if len(row) % 8 != 0:
-            byte_array.append(byte_value)
-    return byte_array
+    bitmaps = render_glyphs(font_paths[size], size, components, box)
+    with stage("pack"):
+        packed = pack_glyphs(bitmaps)
+    return {c: data.reshape(-1).tolist() for c, data in zip(components, packed)}
 
 
 # 각 컴포넌트의 코드 범위 (완성형 제외)
@@ -61,35 +42,54 @@ jungseong_list = [chr(i) for i in range(0x1161, 0x1176)]
 jongseong_list = [chr(i) for i in range(0x11A8, 0x11C3)]
 
 sizes = [10, 16, 24]
-# 각 크기별로 초성, 중성, 종성 비트맵을 생성
-component_bitmap_data = {size: {} for size in sizes}
-for size in sizes:
-    component_bitmap_data[size]["choseong"] = {
-        c: generate_component_bitmap(c, size, "choseong") for c in choseong_list
-    }
-    component_bitmap_data[size]["jungseong"] = {
-        c: generate_component_bitmap(c, size, "jungseong") for c in jungseong_list
-    }
-    component_bitmap_data[size]["jongseong"] = {
-        c: generate_component_bitmap(c, size, "jongseong") for c in jongseong_list
+
+# True면 같은 비트맵을 하나로 모은 풀(_pool.txt)과 인덱스 표(_index.txt)도 함께 생성
+dedup_output = False
+# True면 바운딩 박스로 잘라 비트 단위로 패킹한 압축 테이블(.hgc)도 함께 생성
+compressed_output = False
+# 바이너리 테이블(.bin)의 바이트 레이아웃: "row_msb"(기본값), "row_lsb", "page"(SSD1306/SH1106 세로 8픽셀 페이지)
+# (텍스트 테이블과 압축 테이블은 항상 row_msb)
+layout = "row_msb"
+
+
+def save_component_bitmap_to_file(filename, size, bitmaps):
+    """{컴포넌트 문자: 바이트 배열} 딕셔너리를 텍스트 테이블과 바이너리 테이블(.bin)로 기록합니다."""
+    # 텍스트 테이블 옆에 같은 이름의 바이너리 테이블(.bin)도 함께 기록
+    base_filename = filename.rsplit(".", 1)[0]
+    dedup = GlyphDeduplicator() if dedup_output else None
+    with ExitStack() as stack:
+        sinks = [
+            stack.enter_context(
+                GlyphTableWriter(base_filename + ".bin", size, size, layout)
+            ),
+            dedup,
+        ]
+        if compressed_output:
+            sinks.append(
+                stack.enter_context(
+                    CompressedTableWriter(base_filename + ".hgc", size, size)
+                )
+            )
+        save_complete_bitmap_to_file(filename, bitmaps.items(), *sinks)
+    if dedup is not None:
+        print(format_dedup_stats(base_filename, dedup.save(base_filename)))
+
+
+def main():
+    # 각 크기별로 초성, 중성, 종성 비트맵을 생성한 뒤 파일로 저장 (크기별, 컴포넌트별)
+    components = {
+        "choseong": choseong_list,
+        "jungseong": jungseong_list,
+        "jongseong": jongseong_list,
     }
+    for size in sizes:
+        for component_type, chars in components.items():
+            bitmaps = generate_component_bitmaps(chars, size, component_type)
+            save_component_bitmap_to_file(
+                f"hangul_{size}x{size}_{component_type}.txt", size, bitmaps
+            )
 
 
-def save_component_bitmap_to_file(filename, size, component_type):
-    with open(filename, "w", encoding="utf-8") as file:
-        for char, data in component_bitmap_data[size][component_type].items():
-            hex_data = ", ".join(f"0x{byte:02X}" for byte in data)
-            file.write(f"    {hex_data}, // {char} (U+{ord(char):04X})\n")
-
-
-# 파일 저장 (크기별, 컴포넌트별)
-for size in sizes:
-    save_component_bitmap_to_file(
-        f"hangul_{size}x{size}_choseong.txt", size, "choseong"
-    )
-    save_component_bitmap_to_file(
-        f"hangul_{size}x{size}_jungseong.txt", size, "jungseong"
-    )
-    save_component_bitmap_to_file(
-        f"hangul_{size}x{size}_jongseong.txt", size, "jongseong"
-    )
+if __name__ == "__main__":
+    with profile_run():
+        main()
@@ -0,0 +1,32 @@
+from functools import lru_cache
+
+from instrument import stage
+
+# 동시에 유지할 폰트 핸들의 최대 개수
+# (여러 폰트 × 여러 크기를 한 번에 돌려도 메모리가 무한히 늘지 않도록 제한)
+FONT_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_font(font_path, size, index=0):
+    """
+    (폰트 경로, 크기, 페이스 인덱스)를 키로 FreeType 폰트 핸들을 캐시하여 반환합니다.
+    같은 키로 다시 호출하면 폰트 파일을 다시 열고 파싱하지 않고 기존 핸들을 재사용합니다.
+    """
+    # PIL은 실제로 폰트를 열 때 처음 불러옴 (모듈 import 시간 단축)
+    from PIL import ImageFont
+
+    with stage("font.truetype"):
+        return ImageFont.truetype(font_path, size, index=index)
+
+
+def clear_font_cache():
+    """
+    캐시된 폰트 핸들과, 그 폰트로 구한 바운딩 박스 표(glyph_metrics)를 모두 비웁니다.
+    (폰트 파일을 교체한 뒤 호출)
+    """
+    # glyph_metrics가 이 모듈을 불러오므로 순환 import를 피해 여기서 불러옴
+    from glyph_metrics import get_metrics
+
+    get_font.cache_clear()
+    get_metrics.cache_clear()
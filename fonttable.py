@@ -0,0 +1,348 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from bitpack import LAYOUTS, layout_shape, relayout, unpack_bits
+
+# ==========================================================
+# 바이너리 폰트 테이블 형식 (.bin, 리틀 엔디언)
+#
+#   [헤더 36바이트]
+#     magic        4s   b"HGFT"
+#     version      u16
+#     width        u16  글리프 폭 (픽셀)
+#     height       u16  글리프 높이 (픽셀)
+#     bytes_per_row u16 행당 바이트 수 ((width + 7) // 8)
+#     glyph_count  u32  글리프 개수
+#     first_cp     u32  가장 작은 코드 포인트
+#     last_cp      u32  가장 큰 코드 포인트
+#     glyph_offset u32  글리프 배열 시작 위치
+#     index_offset u32  인덱스 시작 위치 (0이면 인덱스 없음: 연속 범위)
+#     layout       u16  바이트 레이아웃 (bitpack.LAYOUTS의 번호, 0=row_msb)
+#     reserved     u16
+#   [글리프 배열]  glyph_count × 글리프 크기 바이트, 고정 간격
+#                 (row 레이아웃: height × bytes_per_row, page 레이아웃: ceil(height / 8) × width)
+#   [인덱스]      (last_cp - first_cp + 1)개의 u16 슬롯 번호 (없는 글자는 0xFFFF)
+#
+# 글리프 위치는 연속 범위면 (cp - first_cp), 아니면 index[cp - first_cp]로
+# 한 번에 구할 수 있으므로 펌웨어에서도 memcpy 한 번으로 읽을 수 있습니다.
+# ==========================================================
+TABLE_MAGIC = b"HGFT"
+TABLE_VERSION = 2
+HEADER_FORMAT = "<4sHHHHIIIIIHH"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+NO_GLYPH = 0xFFFF
+# row_msb가 아닌 레이아웃으로 기록할 때 한 번에 변환(bit-transpose)하는 글리프 수
+RELAYOUT_BATCH_SIZE = 256
+
+
+class GlyphTableWriter:
+    """
+    글리프를 받는 대로 바이너리 폰트 테이블 파일에 기록합니다.
+    헤더와 인덱스는 close() 시점에 채워지므로 글리프를 메모리에 모아 둘 필요가 없습니다.
+    with 블록이 예외로 끝나면 close() 대신 abort()로 파일을 지웁니다.
+    add()에는 텍스트 테이블과 같은 기본(row_msb) 패킹 글리프를 넘기며,
+    layout이 row_msb가 아니면 RELAYOUT_BATCH_SIZE개씩 모아 해당 레이아웃으로 변환해 기록합니다.
+
+    with GlyphTableWriter("hangul_complete_16x16.bin", 16, 16) as table:
+        table.add("가", byte_array)
+    """
+
+    def __init__(self, filename, width, height, layout="row_msb"):
+        self.filename = filename
+        self.width = width
+        self.height = height
+        self.layout = layout
+        self.bytes_per_row = (width + 7) // 8
+        layout_shape(width, height, layout)  # 알 수 없는 레이아웃이면 ValueError
+        # add()가 받는 row_msb 글리프의 크기
+        self.glyph_size = height * self.bytes_per_row
+        self.codepoints = []
+        self._seen = set()
+        self._pending = []
+        self.file = open(filename, "wb")
+        # 헤더 자리를 비워 두고 글리프 배열부터 기록
+        self.file.write(b"\0" * HEADER_SIZE)
+
+    def add(self, char, data):
+        """문자 하나의 row_msb 패킹 바이트 배열을 글리프 배열 끝에 추가합니다."""
+        glyph = np.asarray(data, dtype=np.uint8).tobytes()
+        if len(glyph) != self.glyph_size:
+            raise ValueError(
+                f"{char!r}: 글리프 크기가 {len(glyph)}바이트입니다 "
+                f"({self.glyph_size}바이트여야 함)"
+            )
+        if len(self.codepoints) >= NO_GLYPH:
+            raise ValueError(f"글리프는 최대 {NO_GLYPH - 1}개까지 저장할 수 있습니다")
+        cp = ord(char)
+        if cp in self._seen:
+            raise ValueError(f"{self.filename}: 중복된 코드 포인트 {char!r} (U+{cp:04X})")
+        self._seen.add(cp)
+        self.codepoints.append(cp)
+        if self.layout == "row_msb":
+            self.file.write(glyph)
+            return
+        self._pending.append(glyph)
+        if len(self._pending) >= RELAYOUT_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        """모아 둔 row_msb 글리프를 테이블 레이아웃으로 한 번에 변환해 기록합니다."""
+        if not self._pending:
+            return
+        packed = np.frombuffer(b"".join(self._pending), dtype=np.uint8)
+        packed = packed.reshape(len(self._pending), self.height, self.bytes_per_row)
+        self.file.write(relayout(packed, self.width, self.height, self.layout).tobytes())
+        self._pending = []
+
+    def close(self):
+        """인덱스를 기록하고 헤더를 채운 뒤 파일을 닫습니다."""
+        if self.file.closed:
+            return
+        self._flush()
+        codepoints = np.array(self.codepoints, dtype=np.int64)
+        if len(np.unique(codepoints)) != len(codepoints):
+            # 헤더가 비어 있는 파일을 남기지 않음 (fresh_table이 고르지 않도록)
+            self.abort()
+            raise ValueError(f"{self.filename}: 중복된 코드 포인트가 있습니다")
+
+        first_cp = int(codepoints.min()) if len(codepoints) else 0
+        last_cp = int(codepoints.max()) if len(codepoints) else 0
+        index_offset = 0
+        dense = len(codepoints) == 0 or (
+            last_cp - first_cp + 1 == len(codepoints)
+            and np.all(np.diff(codepoints) == 1)
+        )
+        if not dense:
+            index = np.full(last_cp - first_cp + 1, NO_GLYPH, dtype="<u2")
+            index[codepoints - first_cp] = np.arange(len(codepoints))
+            index_offset = self.file.tell()
+            self.file.write(index.tobytes())
+
+        header = struct.pack(
+            HEADER_FORMAT,
+            TABLE_MAGIC,
+            TABLE_VERSION,
+            self.width,
+            self.height,
+            self.bytes_per_row,
+            len(codepoints),
+            first_cp,
+            last_cp,
+            HEADER_SIZE,
+            index_offset,
+            LAYOUTS.index(self.layout),
+            0,
+        )
+        self.file.seek(0)
+        self.file.write(header)
+        self.file.close()
+
+    def abort(self):
+        """
+        헤더를 채우지 않고 파일을 닫은 뒤 삭제합니다.
+        중간에 끊긴 테이블이 올바른 테이블처럼 읽히지 않도록 합니다.
+        """
+        self._pending = []
+        if not self.file.closed:
+            self.file.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # 렌더링 도중 예외가 나면 잘린 테이블을 남기지 않음
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class GlyphTableReader:
+    """
+    바이너리 폰트 테이블을 mmap으로 열어 필요한 글리프만 읽습니다.
+    시작 시 파일 전체를 파싱하지 않으며, glyph()는 mmap 위의 numpy 뷰를 그대로 반환합니다.
+
+    with GlyphTableReader("hangul_complete_16x16.bin") as table:
+        packed = table.glyph("가")               # (height, bytes_per_row) 뷰, 복사 없음
+        bitmap = table.glyph("가", unpack=True)  # (height, width), 1=글자 0=배경
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            version,
+            self.width,
+            self.height,
+            self.bytes_per_row,
+            self.glyph_count,
+            self.first_cp,
+            self.last_cp,
+            glyph_offset,
+            index_offset,
+            layout,
+            _,
+        ) = struct.unpack_from(HEADER_FORMAT, self.mmap, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            self.close()
+            raise ValueError(f"{filename}: 지원하지 않는 폰트 테이블 형식입니다")
+
+        self.layout = LAYOUTS[layout]
+        glyph_shape = layout_shape(self.width, self.height, self.layout)
+        self.glyphs = np.frombuffer(
+            self.mmap,
+            dtype=np.uint8,
+            count=self.glyph_count * int(np.prod(glyph_shape)),
+            offset=glyph_offset,
+        ).reshape((self.glyph_count,) + glyph_shape)
+        self.index = None
+        if index_offset:
+            self.index = np.frombuffer(
+                self.mmap,
+                dtype="<u2",
+                count=self.last_cp - self.first_cp + 1,
+                offset=index_offset,
+            )
+
+    def slot(self, char):
+        """문자(또는 코드 포인트)의 글리프 배열 내 위치를 반환합니다. 없으면 None."""
+        cp = char if isinstance(char, int) else ord(char)
+        if self.glyph_count == 0 or not self.first_cp <= cp <= self.last_cp:
+            return None
+        if self.index is None:
+            return cp - self.first_cp
+        slot = int(self.index[cp - self.first_cp])
+        return None if slot == NO_GLYPH else slot
+
+    def glyph(self, char, unpack=False):
+        """
+        문자(또는 코드 포인트)의 글리프를 반환합니다. 테이블에 없으면 KeyError.
+        unpack=False면 레이아웃 그대로의 패킹 뷰(row 레이아웃은 (height, bytes_per_row)),
+        True면 레이아웃에 관계없이 (height, width) 0/1 배열입니다.
+        """
+        slot = self.slot(char)
+        if slot is None:
+            raise KeyError(char)
+        packed = self.glyphs[slot]
+        if unpack:
+            return unpack_bits(packed, self.width, self.height, self.layout)
+        return packed
+
+    def codepoints(self):
+        """테이블에 들어 있는 코드 포인트를 글리프 배열 순서대로 반환합니다."""
+        if self.index is None:
+            return np.arange(self.first_cp, self.first_cp + self.glyph_count)
+        present = np.flatnonzero(self.index != NO_GLYPH)
+        order = np.argsort(self.index[present])
+        return present[order] + self.first_cp
+
+    def items(self, unpack=False):
+        """(문자, 글리프) 쌍을 글리프 배열 순서대로 내보냅니다."""
+        for cp in self.codepoints():
+            yield chr(cp), self.glyph(int(cp), unpack=unpack)
+
+    def __contains__(self, char):
+        return self.slot(char) is not None
+
+    def __len__(self):
+        return self.glyph_count
+
+    def close(self):
+        # numpy 뷰가 mmap을 참조하고 있으면 닫을 수 없으므로 먼저 해제
+        self.glyphs = None
+        self.index = None
+        try:
+            self.mmap.close()
+        except BufferError:
+            # glyph()로 받은 뷰가 아직 남아 있으면, 뷰가 모두 해제될 때 GC가 mmap을 닫음
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def fresh_table(filename):
+    """
+    텍스트 테이블(filename)과 같은 이름의 바이너리 테이블(.bin) 경로를 반환합니다.
+    .bin이 없거나 텍스트 테이블보다 오래되었으면(텍스트를 고치거나 다시 생성한 경우) None을 반환합니다.
+    """
+    table_filename = os.path.splitext(filename)[0] + ".bin"
+    if not os.path.exists(table_filename):
+        return None
+    if os.path.exists(filename) and os.path.getmtime(table_filename) < os.path.getmtime(filename):
+        return None
+    return table_filename
+
+
+class GlyphDeduplicator:
+    """
+    비트 단위로 같은 글리프를 하나로 모아, 고유 비트맵 풀과 코드 포인트→풀 인덱스 표를 만듭니다.
+    GlyphTableWriter와 같이 add()로 글리프를 받는 대로 처리하며, 고유 글리프만 메모리에 남깁니다.
+
+    save("hangul_complete_24x24")는 다음 두 파일을 만듭니다.
+      hangul_complete_24x24_pool.txt   고유 비트맵 (한 줄에 하나, 기존 테이블과 같은 형식)
+      hangul_complete_24x24_index.txt  문자마다 풀 인덱스 한 줄
+    """
+
+    def __init__(self):
+        self.pool = {}  # 글리프 바이트 → 풀 인덱스
+        self.index = []  # (문자, 풀 인덱스)
+        self.glyph_size = 0
+
+    def add(self, char, data):
+        glyph = np.asarray(data, dtype=np.uint8).tobytes()
+        self.glyph_size = len(glyph)
+        slot = self.pool.setdefault(glyph, len(self.pool))
+        self.index.append((char, slot))
+
+    def stats(self):
+        """원본/중복 제거 후 크기(바이트)와 절약률을 딕셔너리로 반환합니다."""
+        index_size = 2 if len(self.pool) <= 0xFFFF else 4
+        original = len(self.index) * self.glyph_size
+        deduplicated = len(self.pool) * self.glyph_size + len(self.index) * index_size
+        return {
+            "glyphs": len(self.index),
+            "unique": len(self.pool),
+            "original_bytes": original,
+            "deduplicated_bytes": deduplicated,
+            "saved_bytes": original - deduplicated,
+            "saved_ratio": (original - deduplicated) / original if original else 0.0,
+        }
+
+    def save(self, base_filename):
+        """고유 비트맵 풀과 인덱스 표를 기록하고 stats()를 반환합니다."""
+        first_char = {}
+        for char, slot in self.index:
+            first_char.setdefault(slot, char)
+
+        with open(f"{base_filename}_pool.txt", "w", encoding="utf-8") as file:
+            for glyph, slot in self.pool.items():
+                hex_data = ", ".join(f"0x{byte:02X}" for byte in glyph)
+                char = first_char[slot]
+                file.write(f"    {hex_data}, // #{slot} {char} (U+{ord(char):04X})\n")
+
+        with open(f"{base_filename}_index.txt", "w", encoding="utf-8") as file:
+            for char, slot in self.index:
+                file.write(f"    {slot}, // {char} (U+{ord(char):04X})\n")
+        return self.stats()
+
+
+def format_dedup_stats(name, stats):
+    """GlyphDeduplicator.stats() 결과를 한 줄 요약 문자열로 만듭니다."""
+    return (
+        f"{name}: {stats['glyphs']}자 중 고유 {stats['unique']}개, "
+        f"{stats['original_bytes']} → {stats['deduplicated_bytes']}바이트 "
+        f"({stats['saved_bytes']}바이트, {stats['saved_ratio']:.1%} 절약)"
+    )
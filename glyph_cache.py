@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+from instrument import count
+
+
+def font_digest(font_path):
+    """폰트 파일 내용의 SHA-256 해시를 반환합니다. (파일 크기·수정 시각이 같으면 재계산하지 않음)"""
+    stat = os.stat(font_path)
+    return _font_digest(os.path.abspath(font_path), stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _font_digest(font_path, file_size, mtime_ns):
+    digest = hashlib.sha256()
+    with open(font_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class GlyphCache:
+    """
+    렌더링된 글리프를 디스크에 저장해 두는 내용 주소(content-addressed) 캐시입니다.
+
+    캐시 키는 (폰트 파일 해시, size, 렌더링 파라미터)이며, 키마다 하나의 .npz 파일에
+    코드 포인트별 패킹된 글리프를 모아 둡니다. 마스크·오프셋·폰트 중 하나만 바뀌어도
+    해당 키만 달라지므로, 입력이 바뀐 글리프만 다시 렌더링하고 나머지는 캐시에서 가져옵니다.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, font_path, size, params):
+        """(폰트 해시, size, 렌더링 파라미터)에 대한 캐시 키(16진 문자열)를 반환합니다."""
+        payload = json.dumps(
+            {"font": font_digest(font_path), "size": size, "params": params},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self, key):
+        """키에 저장된 {코드 포인트: 패킹된 글리프} 딕셔너리를 반환합니다. 없으면 빈 딕셔너리."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return {}
+        with np.load(path) as data:
+            return dict(zip(data["codepoints"].tolist(), data["glyphs"]))
+
+    def save(self, key, glyphs):
+        """{코드 포인트: 패킹된 글리프} 딕셔너리를 키에 저장합니다. (임시 파일에 쓴 뒤 교체)"""
+        codepoints = sorted(glyphs)
+        # 같은 캐시 디렉토리를 쓰는 실행이 동시에 있어도 서로의 임시 파일을 덮어쓰지 않도록
+        # 실행마다 고유한 임시 파일에 쓴 뒤 교체
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as f:
+            try:
+                np.savez(
+                    f,
+                    codepoints=np.array(codepoints, dtype=np.uint32),
+                    glyphs=np.stack([glyphs[cp] for cp in codepoints]),
+                )
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, self._path(key))
+
+    def iter_glyphs(self, font_path, size, params, chars, render):
+        """
+        chars의 (문자, 패킹된 글리프) 쌍을 순서대로 내보냅니다.
+        캐시에 없는 문자만 모아 render(누락된 문자 목록)로 렌더링하고, 그 결과를 캐시에 추가합니다.
+        render는 (문자, 패킹된 글리프) 쌍을 내보내는 이터러블을 반환해야 합니다.
+        """
+        key = self.key(font_path, size, params)
+        glyphs = self.load(key)
+        missing = [char for char in chars if ord(char) not in glyphs]
+        self.hits += len(chars) - len(missing)
+        self.misses += len(missing)
+        count("glyph_cache.hits", len(chars) - len(missing))
+        count("glyph_cache.misses", len(missing))
+
+        if missing:
+            for char, glyph in render(missing):
+                glyphs[ord(char)] = np.asarray(glyph, dtype=np.uint8).reshape(-1)
+            self.save(key, glyphs)
+
+        for char in chars:
+            yield char, glyphs[ord(char)]
@@ -0,0 +1,189 @@
+import os
+import struct
+
+import numpy as np
+
+from instrument import stage
+
+# ==========================================================
+# 압축 글리프 인코딩 (바운딩 박스 트리밍 + 비트 단위 연속 패킹)
+#
+# 1) 글리프마다 글자 픽셀이 있는 최소 사각형 (x0, y0, w, h)만 남깁니다.
+# 2) 남은 w×h 비트를 행 패딩 없이 이어서 모든 글리프를 하나의 비트 스트림으로 패킹합니다.
+#    (기존 테이블은 행마다 바이트 경계까지 패딩하고, 빈 행·빈 열도 그대로 저장합니다.)
+# 글리프의 비트 위치는 w×h의 누적합이므로 별도의 오프셋 표 없이
+# 전체 스트림을 한 번에(벡터화) 복원할 수 있습니다.
+#
+# 압축 테이블 파일(.hgc, 리틀 엔디언, 글리프는 코드 포인트 오름차순)
+#   [헤더]        magic b"HGFC", version u16, width u16, height u16, glyph_count u32,
+#                 first_cp u32, last_cp u32
+#   [코드 포인트] first_cp~last_cp 범위의 존재 여부 비트맵, ceil((last_cp - first_cp + 1) / 8) 바이트
+#   [박스]        u8 × 4 × glyph_count  (x0, y0, w, h; 빈 글리프는 w = h = 0)
+#   [비트 스트림] ceil(Σ w×h / 8) 바이트, MSB 우선
+# ==========================================================
+CODEC_MAGIC = b"HGFC"
+CODEC_VERSION = 1
+CODEC_HEADER_FORMAT = "<4sHHHIII"
+CODEC_HEADER_SIZE = struct.calcsize(CODEC_HEADER_FORMAT)
+
+
+def encode_glyphs(packed, width):
+    """
+    패킹된 글리프 묶음 (N, H, 행당 바이트 수)를 압축하여
+    ((N, 4) uint8 박스 배열, 비트 스트림 바이트열)로 반환합니다.
+    """
+    bits = np.unpackbits(np.asarray(packed, dtype=np.uint8), axis=-1, count=width)
+    bits = bits.astype(bool)
+    n, height, _ = bits.shape
+
+    rows_any = bits.any(axis=2)
+    cols_any = bits.any(axis=1)
+    blank = ~rows_any.any(axis=1)
+    y0 = rows_any.argmax(axis=1)
+    y1 = height - 1 - rows_any[:, ::-1].argmax(axis=1)
+    x0 = cols_any.argmax(axis=1)
+    x1 = width - 1 - cols_any[:, ::-1].argmax(axis=1)
+    h = np.where(blank, 0, y1 - y0 + 1)
+    w = np.where(blank, 0, x1 - x0 + 1)
+    x0 = np.where(blank, 0, x0)
+    y0 = np.where(blank, 0, y0)
+
+    # 박스 안쪽 픽셀만 골라내면 (글리프, 행, 열) 순서 그대로 스트림이 됨
+    ys = np.arange(height)[np.newaxis, :, np.newaxis]
+    xs = np.arange(width)[np.newaxis, np.newaxis, :]
+    inside = (
+        (ys >= y0[:, None, None])
+        & (ys < (y0 + h)[:, None, None])
+        & (xs >= x0[:, None, None])
+        & (xs < (x0 + w)[:, None, None])
+    )
+    boxes = np.stack([x0, y0, w, h], axis=1).astype(np.uint8)
+    return boxes, np.packbits(bits[inside]).tobytes()
+
+
+def decode_glyphs(boxes, stream, width, height):
+    """
+    encode_glyphs의 결과를 파이썬 루프 없이 한 번에 복원하여
+    (N, H, 행당 바이트 수) 패킹 배열로 반환합니다.
+    """
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+    x0, y0, w, h = boxes.T
+    n = len(boxes)
+    areas = w * h
+    total = int(areas.sum())
+    bits = np.unpackbits(np.frombuffer(stream, dtype=np.uint8), count=total)
+
+    # 스트림의 각 비트가 어느 글리프의 몇 번째 픽셀인지 계산
+    glyph_ids = np.repeat(np.arange(n), areas)
+    local = np.arange(total) - np.repeat(np.cumsum(areas) - areas, areas)
+    box_w = np.maximum(w, 1)[glyph_ids]
+    ys = y0[glyph_ids] + local // box_w
+    xs = x0[glyph_ids] + local % box_w
+
+    glyphs = np.zeros((n, height, width), dtype=np.uint8)
+    glyphs[glyph_ids, ys, xs] = bits
+    return np.packbits(glyphs, axis=-1)
+
+
+class CompressedTableWriter:
+    """
+    글리프를 받는 대로 모아 두었다가 close() 시점에 한 번에 압축하여 압축 테이블(.hgc)로 기록합니다.
+    사용법은 GlyphTableWriter와 같습니다. (with 블록이 예외로 끝나면 파일을 기록하지 않음)
+    """
+
+    def __init__(self, filename, width, height):
+        self.filename = filename
+        self.width = width
+        self.height = height
+        self.bytes_per_row = (width + 7) // 8
+        self.codepoints = []
+        self.glyphs = []
+        self.closed = False
+
+    def add(self, char, data):
+        glyph = np.asarray(data, dtype=np.uint8)
+        self.codepoints.append(ord(char))
+        self.glyphs.append(glyph.reshape(self.height, self.bytes_per_row))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        codepoints = np.array(self.codepoints, dtype=np.int64)
+        if len(np.unique(codepoints)) != len(codepoints):
+            raise ValueError(f"{self.filename}: 중복된 코드 포인트가 있습니다")
+        order = np.argsort(codepoints)
+        codepoints = codepoints[order]
+        packed = np.zeros((0, self.height, self.bytes_per_row), dtype=np.uint8)
+        if self.glyphs:
+            packed = np.stack(self.glyphs)[order]
+
+        first_cp = int(codepoints[0]) if len(codepoints) else 0
+        last_cp = int(codepoints[-1]) if len(codepoints) else -1
+        present = np.zeros(last_cp - first_cp + 1, dtype=bool)
+        present[codepoints - first_cp] = True
+        with stage("encode.hgc"):
+            boxes, stream = encode_glyphs(packed, self.width)
+        with open(self.filename, "wb") as f:
+            f.write(
+                struct.pack(
+                    CODEC_HEADER_FORMAT,
+                    CODEC_MAGIC,
+                    CODEC_VERSION,
+                    self.width,
+                    self.height,
+                    len(codepoints),
+                    first_cp,
+                    max(last_cp, 0),
+                )
+            )
+            f.write(np.packbits(present).tobytes())
+            f.write(boxes.tobytes())
+            f.write(stream)
+
+    def abort(self):
+        """
+        모아 둔 글리프를 버리고 파일을 기록하지 않습니다.
+        이전 실행의 같은 이름 파일도 지워, 새 텍스트 테이블과 맞지 않는 압축 테이블이 남지 않게 합니다.
+        """
+        self.closed = True
+        self.codepoints = []
+        self.glyphs = []
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # 렌더링 도중 예외가 나면 잘린 테이블을 기록하지 않음
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def load_compressed_table(filename):
+    """
+    압축 테이블(.hgc) 파일을 읽어 한 번에 복원하고,
+    (코드 포인트 배열, (N, H, 행당 바이트 수) 패킹 배열, width)를 반환합니다.
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    magic, version, width, height, count, first_cp, last_cp = struct.unpack_from(
+        CODEC_HEADER_FORMAT, data, 0
+    )
+    if magic != CODEC_MAGIC or version != CODEC_VERSION:
+        raise ValueError(f"{filename}: 지원하지 않는 압축 테이블 형식입니다")
+
+    pos = CODEC_HEADER_SIZE
+    span = last_cp - first_cp + 1 if count else 0
+    present = np.unpackbits(
+        np.frombuffer(data, dtype=np.uint8, count=(span + 7) // 8, offset=pos),
+        count=span,
+    )
+    codepoints = np.flatnonzero(present) + first_cp
+    pos += (span + 7) // 8
+    boxes = np.frombuffer(data, dtype=np.uint8, count=4 * count, offset=pos)
+    pos += 4 * count
+    return codepoints, decode_glyphs(boxes, data[pos:], width, height), width
@@ -0,0 +1,112 @@
+from functools import lru_cache
+
+import numpy as np
+
+from font_cache import FONT_CACHE_SIZE, get_font
+from instrument import count, stage
+
+# ==========================================================
+# 글리프 메트릭(바운딩 박스) 사전 계산
+#
+# (폰트, 크기)마다 문자 집합 전체의 바운딩 박스를 한 번만 구해
+# 코드 포인트 → 행 번호 인덱스 + (N, 4) int16 배열로 보관하고, 중앙 정렬 위치는 배열 연산 한 번으로 계산합니다.
+# 같은 프로세스에서 같은 문자를 다시 렌더링할 때(다른 문자 집합, 다른 정렬 영역 등)는 getbbox를 호출하지 않습니다.
+#
+# 렌더링은 글리프의 잉크 영역만 래스터화(getmask2)한 뒤 size × size 배열의 해당 위치에 붙여 넣습니다.
+# 위치는 기존 렌더러와 같이 기본 모드 바운딩 박스로 계산하므로,
+# 결과는 전체 캔버스에 draw.text로 그린 것과 픽셀 단위로 같습니다.
+# ==========================================================
+
+# render_glyphs의 결과가 바뀌는 수정(배치·래스터화 방식 등)을 하면 올려야 하는 번호입니다.
+# 렌더링된 글리프 캐시(glyph_cache)의 키에 들어가므로, 올리면 이전 캐시가 무효화됩니다.
+RENDERER_VERSION = 1
+
+
+class GlyphMetrics:
+    """
+    (폰트, 크기) 하나의 글리프 바운딩 박스 표입니다.
+    바운딩 박스 (x0, y0, x1, y1)는 구한 순서대로 (N, 4) int16 배열의 행에 쌓고,
+    index는 코드 포인트 → 행 번호입니다. 아직 구하지 않은 문자는 요청될 때 한꺼번에 구해 추가합니다.
+    """
+
+    def __init__(self, font_path, size):
+        self.font_path = font_path
+        self.size = size
+        self.index = {}
+        self._bboxes = np.zeros((0, 4), dtype=np.int16)
+
+    @property
+    def bboxes(self):
+        """지금까지 구한 바운딩 박스의 (N, 4) 배열입니다. (index의 행 순서)"""
+        return self._bboxes[: len(self.index)]
+
+    def bbox(self, chars):
+        """chars의 바운딩 박스를 (N, 4) 배열로 반환합니다. (표에 없는 문자만 getbbox 호출)"""
+        codepoints = [ord(char) for char in chars]
+        missing = list(dict.fromkeys(cp for cp in codepoints if cp not in self.index))
+        if missing:
+            font = get_font(self.font_path, self.size)
+            with stage("metrics.getbbox"):
+                bboxes = [font.getbbox(chr(cp)) for cp in missing]
+            count("metrics.measured", len(missing))
+            self._append(missing, bboxes)
+        return self._bboxes[[self.index[cp] for cp in codepoints]]
+
+    def _append(self, codepoints, bboxes):
+        start = len(self.index)
+        end = start + len(codepoints)
+        if end > len(self._bboxes):
+            # 한 글자씩 요청되어도 복사 비용이 누적되지 않도록 용량을 두 배씩 늘림
+            grown = np.zeros((max(end, 2 * len(self._bboxes)), 4), dtype=np.int16)
+            grown[:start] = self._bboxes[:start]
+            self._bboxes = grown
+        self._bboxes[start:end] = bboxes
+        self.index.update(zip(codepoints, range(start, end)))
+
+    def offsets(self, chars, box=None):
+        """
+        chars를 box(기본값: 전체 영역 (0, 0, size, size)) 안에 중앙 정렬할 때
+        draw.text에 넘길 (x, y) 위치를 (N, 2) 배열로 반환합니다.
+        """
+        if box is None:
+            box = (0, 0, self.size, self.size)
+        bboxes = self.bbox(chars).astype(np.int32)
+        text_size = bboxes[:, 2:] - bboxes[:, :2]
+        box_size = np.array([box[2] - box[0], box[3] - box[1]])
+        # 음수 오프셋 보정 후 영역 내 중앙 정렬
+        return -bboxes[:, :2] + np.array(box[:2]) + (box_size - text_size) // 2
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_metrics(font_path, size):
+    """(폰트 경로, 크기)의 GlyphMetrics를 반환합니다. (프로세스마다 하나씩 유지)"""
+    return GlyphMetrics(font_path, size)
+
+
+def render_glyphs(font_path, size, chars, box=None):
+    """
+    chars를 size × size 영역의 box(기본값: 전체 영역) 안에 중앙 정렬하여 렌더링한
+    (N, size, size) 배열(0=검정 글자, 1=흰 배경)을 반환합니다.
+    글리프마다 잉크 영역만 래스터화하고, 캔버스 밖으로 나가는 부분은 잘라 냅니다.
+    """
+    font = get_font(font_path, size)
+    origins = get_metrics(font_path, size).offsets(chars, box)
+    bitmaps = np.ones((len(chars), size, size), dtype=np.uint8)
+    for bitmap, char, (x, y) in zip(bitmaps, chars, origins.tolist()):
+        # draw.text와 같은 모드 "1" 마스크 (잉크 영역 크기)와 그 시작 위치
+        with stage("render.rasterize"):
+            mask, (dx, dy) = font.getmask2(char, "1")
+        count("glyphs.rendered")
+        width, height = mask.size
+        if not (width and height):
+            continue
+        # 마스크는 행 패딩 없는 8비트(0/255) 버퍼
+        ink = np.frombuffer(bytes(mask), dtype=np.uint8).reshape(height, width)
+        x0, y0 = x + dx, y + dy
+        left, top = max(0, -x0), max(0, -y0)
+        right, bottom = min(width, size - x0), min(height, size - y0)
+        if left >= right or top >= bottom:
+            continue
+        region = bitmap[y0 + top : y0 + bottom, x0 + left : x0 + right]
+        region[ink[top:bottom, left:right] != 0] = 0
+    return bitmaps
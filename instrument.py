@@ -0,0 +1,239 @@
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# ==========================================================
+# 단계별 계측 (opt-in)
+#
+#   with stage("render.rasterize"):   # 단계별 누적 시간·호출 수
+#       ...
+#   count("glyphs.rendered")          # 카운터
+#
+# 기본값은 꺼짐이며, 꺼져 있으면 stage()는 미리 만든 빈 컨텍스트를, count()는 바로 반환하므로
+# 계측 코드가 있어도 추가 비용이 거의 없습니다.
+# 켜는 방법: profile_run(경로)로 감싸거나, 환경 변수 HANGUL_PROFILE=경로 (.json이면 JSON, 아니면 텍스트;
+# "-"면 표준 출력에 텍스트)를 지정합니다.
+# convert.py·build.py는 --profile 옵션을 받고, 나머지 스크립트는 __main__에서 main()을
+# profile_run()으로 감싸므로 환경 변수로 켤 수 있습니다.
+# 프로세스 풀은 worker_pool()로 만들고 작업 함수를 PoolTask로 감싸면, worker에서 측정한 값이
+# 청크 결과와 함께 돌아와 merge_pool_results()에서 부모 프로세스의 값에 합쳐집니다.
+# ==========================================================
+PROFILE_ENV = "HANGUL_PROFILE"
+
+enabled = False
+_timers = defaultdict(float)
+_calls = defaultdict(int)
+_counters = defaultdict(int)
+# worker에서 모은 폰트 핸들 캐시 적중·미스 수 (부모의 get_font.cache_info()에는 없는 값)
+_worker_caches = defaultdict(int)
+# 이 프로세스에서 마지막으로 collect()한 시점의 get_font.cache_info() (hits, misses)
+_font_seen = (0, 0)
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _timers[self.name] += time.perf_counter() - self.start
+        _calls[self.name] += 1
+
+
+def stage(name):
+    """name 단계의 소요 시간을 누적하는 컨텍스트 매니저를 반환합니다. (꺼져 있으면 빈 컨텍스트)"""
+    return _Stage(name) if enabled else _NULL_STAGE
+
+
+def count(name, n=1):
+    """카운터 name을 n만큼 늘립니다. (꺼져 있으면 아무 일도 하지 않음)"""
+    if enabled:
+        _counters[name] += n
+
+
+def enable(flag=True):
+    global enabled
+    enabled = flag
+
+
+def reset():
+    """누적된 시간과 카운터를 모두 비웁니다."""
+    _timers.clear()
+    _calls.clear()
+    _counters.clear()
+    _worker_caches.clear()
+
+
+def _font_delta():
+    """마지막 호출 이후 늘어난 폰트 핸들 캐시 (적중 수, 미스 수)를 반환합니다."""
+    from font_cache import get_font
+
+    global _font_seen
+    info = get_font.cache_info()
+    delta = (info.hits - _font_seen[0], info.misses - _font_seen[1])
+    _font_seen = (info.hits, info.misses)
+    return delta
+
+
+def _init_worker(flag):
+    # fork로 복사된 부모의 누적값이 다시 합쳐지지 않도록 비우고 시작
+    enable(flag)
+    reset()
+    _font_delta()
+
+
+def worker_pool(processes):
+    """현재 계측 설정(켜짐/꺼짐)을 worker에 넘기는 프로세스 풀을 만듭니다."""
+    from multiprocessing import Pool
+
+    return Pool(processes, initializer=_init_worker, initargs=(enabled,))
+
+
+def collect():
+    """
+    worker에서 지금까지 측정한 값을 딕셔너리로 꺼내고 비웁니다. (꺼져 있으면 None)
+    merge()로 다른 프로세스의 값에 더할 수 있습니다.
+    """
+    if not enabled:
+        return None
+    font_hits, font_misses = _font_delta()
+    data = {
+        "timers": dict(_timers),
+        "calls": dict(_calls),
+        "counters": dict(_counters),
+        "caches": {"font.hits": font_hits, "font.misses": font_misses},
+    }
+    reset()
+    return data
+
+
+def merge(data):
+    """collect()로 꺼낸 값을 이 프로세스의 누적값에 더합니다. (None은 무시)"""
+    if data is None:
+        return
+    for target, values in (
+        (_timers, data["timers"]),
+        (_calls, data["calls"]),
+        (_counters, data["counters"]),
+        (_worker_caches, data["caches"]),
+    ):
+        for name, value in values.items():
+            target[name] += value
+
+
+class PoolTask:
+    """
+    프로세스 풀에 넘길 작업 함수를 감싸, 결과와 함께 그 작업 동안 worker에서 측정한 값을 반환합니다.
+    func는 pickle할 수 있도록 모듈 최상위 함수여야 합니다.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, task):
+        return self.func(task), collect()
+
+
+def merge_pool_results(results):
+    """PoolTask로 감싼 작업의 결과에서 측정값을 merge()하고 결과만 순서대로 내보냅니다."""
+    for result, data in results:
+        merge(data)
+        yield result
+
+
+def cache_stats():
+    """폰트 핸들 캐시, 합성 글리프 캐시, 디스크 글리프 캐시의 적중률을 딕셔너리로 반환합니다."""
+    from compose import composed_glyph_cache
+    from font_cache import get_font
+
+    font = get_font.cache_info()
+    font_hits = font.hits + _worker_caches["font.hits"]
+    font_misses = font.misses + _worker_caches["font.misses"]
+    font_lookups = font_hits + font_misses
+    composed = composed_glyph_cache.stats()
+    disk_hits = _counters.get("glyph_cache.hits", 0)
+    disk_lookups = disk_hits + _counters.get("glyph_cache.misses", 0)
+    return {
+        "font": {
+            "hits": font_hits,
+            "misses": font_misses,
+            "hit_ratio": font_hits / font_lookups if font_lookups else 0.0,
+        },
+        "composed_glyph": {
+            key: composed[key] for key in ("hits", "misses", "evictions", "hit_ratio")
+        },
+        "glyph_cache": {
+            "hits": disk_hits,
+            "misses": disk_lookups - disk_hits,
+            "hit_ratio": disk_hits / disk_lookups if disk_lookups else 0.0,
+        },
+    }
+
+
+def report():
+    """현재까지의 단계별 시간, 카운터, 캐시 적중률을 딕셔너리로 반환합니다."""
+    return {
+        "stages": {
+            name: {"seconds": round(_timers[name], 6), "calls": _calls[name]}
+            for name in sorted(_timers, key=_timers.get, reverse=True)
+        },
+        "counters": dict(sorted(_counters.items())),
+        "caches": cache_stats(),
+    }
+
+
+def format_report(data):
+    """report()의 결과를 텍스트 표로 만듭니다."""
+    lines = [f"{'stage':<28} {'seconds':>10} {'calls':>10} {'us/call':>10}"]
+    for name, stat in data["stages"].items():
+        per_call = stat["seconds"] / stat["calls"] * 1e6 if stat["calls"] else 0.0
+        lines.append(
+            f"{name:<28} {stat['seconds']:>10.4f} {stat['calls']:>10} {per_call:>10.1f}"
+        )
+    for name, value in data["counters"].items():
+        lines.append(f"{name:<28} {value:>10}")
+    for name, stat in data["caches"].items():
+        lines.append(
+            f"{name + ' cache':<28} hits {stat['hits']}, misses {stat['misses']}, "
+            f"hit ratio {stat['hit_ratio']:.1%}"
+        )
+    return "\n".join(lines)
+
+
+def dump(path):
+    """결과를 path에 기록합니다. (.json이면 JSON, "-"면 표준 출력, 그 외에는 텍스트)"""
+    data = report()
+    if path == "-":
+        print(format_report(data))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        else:
+            f.write(format_report(data) + "\n")
+
+
+@contextmanager
+def profile_run(path=None):
+    """
+    path(생략하면 환경 변수 HANGUL_PROFILE)가 주어지면 블록 동안 계측을 켜고,
+    블록이 끝나면 결과를 기록합니다. 둘 다 없으면 아무 일도 하지 않습니다.
+    """
+    path = path or os.environ.get(PROFILE_ENV)
+    if not path:
+        yield
+        return
+    enable()
+    try:
+        yield
+    finally:
+        enable(False)
+        dump(path)
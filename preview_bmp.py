@@ -1,7 +1,8 @@
 import os
-import random
-from PIL import Image, ImageChops
-import matplotlib.pyplot as plt
+
+import numpy as np
+
+from instrument import count, profile_run, stage
 
 # 각 폴더 경로 설정
 chosung_dir = "bmp_output_chosung"
@@ -9,31 +10,75 @@ jungsung_dir = "bmp_output_jungsung"
 jongsung_dir = "bmp_output_jongsung"
 
 
-def get_bmp_files(directory):
-    """지정한 디렉토리 내 BMP 파일 경로 목록을 반환합니다."""
-    return [
-        os.path.join(directory, f)
-        for f in os.listdir(directory)
-        if f.lower().endswith(".bmp")
-    ]
-
+class BMPComponentStore:
+    """
+    BMP 컴포넌트 디렉토리를 한 번만 훑어 (size, 문자) → 파일 경로 인덱스를 만들고,
+    각 BMP는 처음 요청될 때 한 번만 디코딩하여 (H, W) uint8 배열(0=검정, 255=흰색)로 보관합니다.
+    이후의 조회·병합은 디스크를 다시 읽지 않고 메모리의 배열만 사용합니다.
+    """
 
-def filter_files_by_char(files, size, allowed_chars):
+    def __init__(self, directory):
+        self.directory = directory
+        self.paths = {}
+        self._bitmaps = {}
+        # 파일명 형식: unicode_{size}x{size}_{문자}.bmp
+        for entry in os.scandir(directory):
+            name, ext = os.path.splitext(entry.name)
+            if ext.lower() != ".bmp":
+                continue
+            parts = name.split("_")
+            if len(parts) < 3:
+                continue
+            width, _, height = parts[1].partition("x")
+            if not (width.isdigit() and width == height):
+                continue
+            self.paths[(int(width), parts[-1])] = entry.path
+
+    def chars(self, size):
+        """size 크기의 BMP가 있는 문자 목록을 반환합니다."""
+        return sorted(char for s, char in self.paths if s == size)
+
+    def get(self, size, char):
+        """(size, 문자)의 비트맵 배열을 반환합니다. (처음 한 번만 디코딩)"""
+        key = (size, char)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            from PIL import Image
+
+            with stage("bmp.decode"), Image.open(self.paths[key]) as img:
+                bitmap = np.array(img.convert("L"), dtype=np.uint8)
+            self._bitmaps[key] = bitmap
+            count("bmp.decoded")
+        return bitmap
+
+    def stack(self, size, allowed_chars=None):
+        """
+        allowed_chars(생략하면 전체) 중 BMP가 있는 문자의 비트맵을 (N, H, W) 배열로 쌓아 반환합니다.
+        BMP가 하나도 없으면 None을 반환합니다.
+        """
+        chars = self.chars(size)
+        if allowed_chars is not None:
+            chars = [char for char in chars if char in allowed_chars]
+        if not chars:
+            return None
+        return np.stack([self.get(size, char) for char in chars])
+
+
+def merge_random_components(stacks, n_images, rng=None):
     """
-    파일명에서 마지막 '_' 이후의 문자(확장자 제외)를 추출하여,
-    allowed_chars 목록에 포함된 파일만 반환합니다.
-    예) 파일명이 "unicode_10x10_가.bmp"인 경우, '가'를 추출하여 비교합니다.
+    컴포넌트별 비트맵 묶음(stacks, 각 (N, H, W))에서 무작위로 하나씩 골라
+    초성, 중성, 종성 이미지를 Z축(겹침)으로 병합한 (n_images, H, W) 배열을 반환합니다.
+    각 픽셀은 세 이미지 중 가장 어두운(검정에 가까운) 값으로 결정됩니다.
+    모든 병합은 캐시된 배열에 대한 np.minimum으로 한 번에 계산합니다. (None인 묶음은 건너뜀)
     """
-    filtered = []
-    for f in files:
-        base = os.path.basename(f)
-        parts = base.split("_")
-        if len(parts) >= 3 and parts[1] == f"{size}x{size}":
-            char_with_ext = parts[-1]
-            char = os.path.splitext(char_with_ext)[0]
-            if char in allowed_chars:
-                filtered.append(f)
-    return filtered
+    rng = np.random.default_rng() if rng is None else rng
+    merged = None
+    for stack in stacks:
+        if stack is None:
+            continue
+        picked = stack[rng.integers(len(stack), size=n_images)]
+        merged = picked if merged is None else np.minimum(merged, picked)
+    return merged
 
 
 # ===== 사용자가 지정할 문자 목록 =====
@@ -43,58 +88,43 @@ chosung_chars = ["궤", "눼", "뒈", "뤠", "뭬", "붸", "쉐", "웨", "줴",
 jungsung_chars = ["웰", "앨", ]  # 중성 폴더에서 사용할 문자 필터
 jongsung_chars = ["앍","앑","악","압","앛","앟","앉","알"]  # 종성 폴더에서 사용할 문자 필터
 
-# 폴더별 전체 BMP 파일 목록을 가져온 후, 필터링 적용
-chosung_files_all = get_bmp_files(chosung_dir)
-jungsung_files_all = get_bmp_files(jungsung_dir)
-jongsung_files_all = get_bmp_files(jongsung_dir)
 
-chosung_files = filter_files_by_char(chosung_files_all, size, chosung_chars)
-jungsung_files = filter_files_by_char(jungsung_files_all, size, jungsung_chars)
-jongsung_files = filter_files_by_char(jongsung_files_all, size, jongsung_chars)
+def main():
+    # matplotlib은 미리보기 창을 띄울 때만 필요하므로 여기서 불러옴
+    import matplotlib.pyplot as plt
 
+    # 폴더별로 한 번만 인덱싱하고, 필터에 해당하는 문자의 비트맵만 디코딩
+    stacks = [
+        BMPComponentStore(chosung_dir).stack(size, chosung_chars),
+        BMPComponentStore(jungsung_dir).stack(size, jungsung_chars),
+        BMPComponentStore(jongsung_dir).stack(size, jongsung_chars),
+    ]
 
-def merge_random_components():
-    """
-    각 폴더에서 미리 지정된 파일 목록을 대상으로 무작위로 BMP 파일을 선택하여,
-    초성, 중성, 종성 이미지를 Z축(겹침)으로 병합한 최종 이미지를 반환합니다.
-    각 픽셀은 세 이미지 중 가장 어두운(검정에 가까운) 값으로 결정됩니다.
-    """
-    if len(chosung_files) is not 0:
-        chosung_file = random.choice(chosung_files)
-        chosung_img = Image.open(chosung_file).convert("L")
-        merged_img = chosung_img
-    if len(jungsung_files) is not 0:
-        jungsung_file = random.choice(jungsung_files)
-        jungsung_img = Image.open(jungsung_file).convert("L")
-        merged_img = ImageChops.darker(merged_img, jungsung_img)
-    if len(jongsung_files) is not 0:
-        jongsung_file = random.choice(jongsung_files)
-        jongsung_img = Image.open(jongsung_file).convert("L")
-        merged_img = ImageChops.darker(merged_img, jongsung_img)
-
-    return merged_img
-
-
-# 총 30개의 병합 이미지를 생성
-n_images = 60
-merged_images = [merge_random_components() for _ in range(n_images)]
-
-# 그리드 설정: 6행 x 5열 (6*5 = 30)
-cols = 10
-rows_grid = (n_images + cols - 1) // cols
-
-fig, axs = plt.subplots(rows_grid, cols, figsize=(cols * 2, rows_grid * 2))
-# axs가 다차원 배열이면 flatten
-axs = axs.flatten() if hasattr(axs, "flatten") else [axs]
-
-for i, merged_img in enumerate(merged_images):
-    axs[i].imshow(merged_img, cmap="gray", vmin=0, vmax=255)
-    axs[i].axis("off")
-    axs[i].set_title(f"Merge {i+1}", fontsize=8)
-
-# 남은 서브플롯 숨김
-for j in range(i + 1, len(axs)):
-    axs[j].axis("off")
-
-plt.tight_layout()
-plt.show()
+    # 총 60개의 병합 이미지를 생성
+    n_images = 60
+    merged_images = merge_random_components(stacks, n_images)
+
+    # 그리드 설정: 6행 x 10열 (6*10 = 60)
+    cols = 10
+    rows_grid = (n_images + cols - 1) // cols
+
+    fig, axs = plt.subplots(rows_grid, cols, figsize=(cols * 2, rows_grid * 2))
+    # axs가 다차원 배열이면 flatten
+    axs = axs.flatten() if hasattr(axs, "flatten") else [axs]
+
+    for i, merged_img in enumerate(merged_images):
+        axs[i].imshow(merged_img, cmap="gray", vmin=0, vmax=255)
+        axs[i].axis("off")
+        axs[i].set_title(f"Merge {i+1}", fontsize=8)
+
+    # 남은 서브플롯 숨김
+    for j in range(i + 1, len(axs)):
+        axs[j].axis("off")
+
+    plt.tight_layout()
+    plt.show()
+
+
+if __name__ == "__main__":
+    with profile_run():
+        main()
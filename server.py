@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import json
+import os
+import struct
+import time
+from collections import deque
+
+import numpy as np
+
+from bitpack import pack_bits, unpack_bits
+from compose import CompositionAtlas, load_bitmap_table, load_component_bitmap_file
+from fonttable import GlyphTableReader, fresh_table
+
+# ==========================================================
+# 글리프 서버 (asyncio)
+#
+# 요청: 한 줄짜리 JSON
+#   {"size": 16, "text": "한글"}            문자열의 글리프
+#   {"size": 16, "codepoints": [44032]}     코드 포인트 목록의 글리프
+#   {"op": "stats"}                         카운터 (응답 본문은 JSON)
+# 응답: 헤더(magic b"HGSR", status u16, width u16, height u16, 본문 길이 u32, 리틀 엔디언) + 본문
+#   status 0: 본문은 요청 순서대로 이어 붙인 row_msb 패킹 글리프 (N × H × 행당 바이트 수)
+#   status 1: 본문은 UTF-8 오류 메시지
+# 완성형 테이블에 없는 음절은 초성·중성·종성 테이블로 합성하고, 한글이 아니면 빈 글리프입니다.
+# ==========================================================
+RESPONSE_MAGIC = b"HGSR"
+RESPONSE_HEADER_FORMAT = "<4sHHHI"
+RESPONSE_HEADER_SIZE = struct.calcsize(RESPONSE_HEADER_FORMAT)
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+default_sizes = [10, 16, 24]
+# 지연 시간 백분위 계산에 쓸 최근 요청 수
+LATENCY_WINDOW = 10000
+# 요청 한 줄의 최대 길이 (완성형 11,172자 전체를 코드 포인트로 요청해도 약 78KB)
+REQUEST_LIMIT = 4 * 1024 * 1024
+MAX_CODEPOINT = 0x10FFFF
+
+
+class GlyphStore:
+    """
+    크기별 완성형 테이블과 초성·중성·종성 아틀라스를 한 번만 읽어 메모리에 두고,
+    코드 포인트 묶음을 (N, H, 행당 바이트 수) 패킹 배열로 한 번에 찾아 줍니다.
+    """
+
+    def __init__(self, table_dir=".", sizes=default_sizes):
+        self.tables = {}
+        for size in sizes:
+            codepoints, packed = self._load_complete(table_dir, size)
+            order = np.argsort(codepoints)
+            comp_dicts = {
+                component: load_component_bitmap_file(
+                    os.path.join(table_dir, f"hangul_{size}x{size}_{component}.txt"),
+                    size,
+                    size,
+                )
+                for component in ["choseong", "jungseong", "jongseong"]
+            }
+            self.tables[size] = (
+                codepoints[order],
+                packed[order],
+                CompositionAtlas(comp_dicts, size, size),
+            )
+
+    @staticmethod
+    def _load_complete(table_dir, size):
+        """완성형 테이블을 (코드 포인트 배열, row_msb 패킹 배열)로 읽습니다. (최신 .bin 우선)"""
+        base = os.path.join(table_dir, f"hangul_complete_{size}x{size}")
+        table_filename = fresh_table(base + ".txt")
+        if table_filename is not None:
+            with GlyphTableReader(table_filename) as table:
+                codepoints = table.codepoints().astype(np.int64)
+                bits = unpack_bits(table.glyphs, size, size, table.layout)
+                return codepoints, pack_bits(bits)
+        if os.path.exists(base + ".txt"):
+            codepoints, packed = load_bitmap_table(base + ".txt", size, size)
+            return np.array(codepoints, dtype=np.int64), packed
+        empty = np.zeros((0, size, (size + 7) // 8), dtype=np.uint8)
+        return np.zeros(0, dtype=np.int64), empty
+
+    def lookup(self, codepoints, size):
+        """
+        코드 포인트 목록의 글리프를 (N, H, 행당 바이트 수) 배열로 반환합니다.
+        size와 각 코드 포인트는 정수여야 합니다. (실수·문자열·불리언은 변환하지 않고 ValueError)
+        """
+        # JSON의 true/16.0/"16"이 조용히 정수로 바뀌지 않도록 형식을 먼저 확인
+        if type(size) is not int:
+            raise ValueError("크기는 정수여야 합니다")
+        if not isinstance(codepoints, list) or not all(type(cp) is int for cp in codepoints):
+            raise ValueError("코드 포인트는 정수 목록이어야 합니다")
+        if size not in self.tables:
+            raise ValueError(f"지원하지 않는 크기: {size}")
+        table_cps, table_packed, atlas = self.tables[size]
+        try:
+            codepoints = np.asarray(codepoints, dtype=np.int64)
+        except OverflowError:
+            raise ValueError("코드 포인트가 유니코드 범위를 벗어났습니다") from None
+        if len(codepoints) and (codepoints.min() < 0 or codepoints.max() > MAX_CODEPOINT):
+            raise ValueError("코드 포인트가 유니코드 범위를 벗어났습니다")
+        # 테이블에 있는 글리프는 이진 탐색 + gather, 없는 글리프만 아틀라스로 합성
+        slots = np.minimum(np.searchsorted(table_cps, codepoints), len(table_cps) - 1)
+        if len(table_cps):
+            found = table_cps[slots] == codepoints
+        else:
+            found = np.zeros(len(codepoints), dtype=bool)
+        glyphs = atlas.compose_codepoints_packed(codepoints)
+        glyphs[found] = table_packed[slots[found]]
+        return glyphs
+
+
+class ServerStats:
+    """요청 단위의 지연 시간·처리량 카운터입니다."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.glyphs = 0
+        self.bytes_sent = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency, glyphs, bytes_sent, error=False):
+        self.requests += 1
+        self.errors += error
+        self.glyphs += glyphs
+        self.bytes_sent += bytes_sent
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latencies.append(latency)
+
+    def snapshot(self):
+        """카운터를 딕셔너리로 반환합니다. (지연 시간은 마이크로초, 백분위는 최근 요청 기준)"""
+        uptime = time.perf_counter() - self.started
+        recent = np.array(self.latencies) * 1e6
+        p50, p99 = np.percentile(recent, [50, 99]) if len(recent) else (0.0, 0.0)
+        return {
+            "uptime_sec": round(uptime, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "glyphs": self.glyphs,
+            "bytes_sent": self.bytes_sent,
+            "requests_per_sec": round(self.requests / uptime, 1) if uptime else 0.0,
+            "glyphs_per_sec": round(self.glyphs / uptime, 1) if uptime else 0.0,
+            "latency_avg_us": (
+                round(self.latency_total / self.requests * 1e6, 1) if self.requests else 0.0
+            ),
+            "latency_p50_us": round(float(p50), 1),
+            "latency_p99_us": round(float(p99), 1),
+            "latency_max_us": round(self.latency_max * 1e6, 1),
+        }
+
+
+class GlyphServer:
+    """GlyphStore의 글리프를 한 줄 JSON 요청 / 바이너리 응답으로 제공하는 asyncio 서버입니다."""
+
+    def __init__(self, store):
+        self.store = store
+        self.stats = ServerStats()
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        """서버를 시작하고 실제로 바인딩된 (host, port)를 반환합니다. (port=0이면 임의 포트)"""
+        self.server = await asyncio.start_server(
+            self._handle, host, port, limit=REQUEST_LIMIT
+        )
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def respond(self, line):
+        """요청 한 줄을 처리하여 (응답 바이트열, 글리프 수, 오류 여부)를 반환합니다."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("요청은 JSON 객체여야 합니다")
+            if request.get("op") == "stats":
+                body = json.dumps(self.stats.snapshot()).encode("utf-8")
+                return _response(STATUS_OK, 0, 0, body), 0, False
+            size = request["size"]
+            if "text" in request:
+                if not isinstance(request["text"], str):
+                    raise ValueError("text는 문자열이어야 합니다")
+                codepoints = [ord(ch) for ch in request["text"]]
+            else:
+                codepoints = request["codepoints"]
+            glyphs = self.store.lookup(codepoints, size)
+            return _response(STATUS_OK, size, size, glyphs.tobytes()), len(glyphs), False
+        except (ValueError, KeyError, TypeError) as e:
+            return _response(STATUS_ERROR, 0, 0, str(e).encode("utf-8")), 0, True
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 한 줄이 REQUEST_LIMIT를 넘으면 나머지 스트림을 해석할 수 없으므로 오류 응답 후 연결을 닫음
+                    message = f"요청이 너무 깁니다 (최대 {REQUEST_LIMIT}바이트)"
+                    response = _response(STATUS_ERROR, 0, 0, message.encode("utf-8"))
+                    writer.write(response)
+                    await writer.drain()
+                    self.stats.record(0.0, 0, len(response), error=True)
+                    break
+                if not line:
+                    break
+                start = time.perf_counter()
+                response, glyphs, error = self.respond(line)
+                writer.write(response)
+                await writer.drain()
+                self.stats.record(time.perf_counter() - start, glyphs, len(response), error)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _response(status, width, height, body):
+    header = struct.pack(
+        RESPONSE_HEADER_FORMAT, RESPONSE_MAGIC, status, width, height, len(body)
+    )
+    return header + body
+
+
+class GlyphClient:
+    """GlyphServer용 asyncio 클라이언트입니다. (한 연결에서 요청을 순서대로 보냄)"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=0):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, request):
+        """요청 딕셔너리를 보내고 (status, width, height, 본문)을 반환합니다."""
+        self.writer.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        header = await self.reader.readexactly(RESPONSE_HEADER_SIZE)
+        magic, status, width, height, length = struct.unpack(RESPONSE_HEADER_FORMAT, header)
+        if magic != RESPONSE_MAGIC:
+            raise ValueError("글리프 서버 응답이 아닙니다")
+        return status, width, height, await self.reader.readexactly(length)
+
+    async def glyphs(self, size, text=None, codepoints=None):
+        """문자열 또는 코드 포인트 목록의 글리프를 (N, H, 행당 바이트 수) 배열로 받습니다."""
+        request = {"size": size}
+        if text is not None:
+            request["text"] = text
+        else:
+            request["codepoints"] = list(codepoints)
+        status, width, height, body = await self.request(request)
+        if status != STATUS_OK:
+            raise ValueError(body.decode("utf-8"))
+        packed = np.frombuffer(body, dtype=np.uint8)
+        return packed.reshape(-1, height, (width + 7) // 8)
+
+    async def stats(self):
+        """서버 카운터를 딕셔너리로 받습니다."""
+        _, _, _, body = await self.request({"op": "stats"})
+        return json.loads(body)
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            # 서버가 먼저 연결을 닫은 경우 (예: 요청이 REQUEST_LIMIT를 넘음)
+            pass
+
+
+async def serve(store, host, port):
+    server = GlyphServer(store)
+    host, port = await server.start(host, port)
+    print(f"글리프 서버: {host}:{port}")
+    async with server.server:
+        await server.server.serve_forever()
+
+
+async def loopback_bench(store, clients, requests, size, text):
+    """
+    같은 이벤트 루프에서 서버와 clients개의 루프백 클라이언트를 띄워 동시에 requests번씩 요청하고,
+    응답이 store.lookup 결과와 같은지 확인한 뒤 서버 카운터를 반환합니다.
+    """
+    server = GlyphServer(store)
+    host, port = await server.start()
+    expected = store.lookup([ord(ch) for ch in text], size)
+
+    async def run_client():
+        client = await GlyphClient.connect(host, port)
+        try:
+            for _ in range(requests):
+                glyphs = await client.glyphs(size, text=text)
+                if not np.array_equal(glyphs, expected):
+                    raise AssertionError("서버 응답이 테이블과 다릅니다")
+        finally:
+            await client.close()
+
+    await asyncio.gather(*(run_client() for _ in range(clients)))
+    stats = server.stats.snapshot()
+    await server.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="패킹된 글리프를 제공하는 asyncio 서버")
+    parser.add_argument("--table-dir", default=".", help="테이블 파일이 있는 디렉토리")
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes)
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve", help="서버 실행")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    bench_parser = sub.add_parser("bench", help="루프백 클라이언트로 동시 요청 측정")
+    bench_parser.add_argument("--clients", type=int, default=32)
+    bench_parser.add_argument("--requests", type=int, default=100)
+    bench_parser.add_argument("--size", type=int, default=16)
+    bench_parser.add_argument("--text", default="다람쥐 헌 쳇바퀴에 타고파")
+    args = parser.parse_args()
+
+    store = GlyphStore(args.table_dir, args.sizes)
+    if args.command == "serve":
+        asyncio.run(serve(store, args.host, args.port))
+    else:
+        stats = asyncio.run(
+            loopback_bench(store, args.clients, args.requests, args.size, args.text)
+        )
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from compose import load_bitmap_table
+from glyph_codec import (
+    CompressedTableWriter,
+    decode_glyphs,
+    encode_glyphs,
+    load_compressed_table,
+)
+from verify import table_size
+
+# 저장소에 커밋된 텍스트 테이블 전체 (완성형, 초성·중성·종성)
+TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+TABLES = sorted(glob.glob(os.path.join(TABLE_DIR, "hangul_*_*.txt")))
+
+
+def load_table(filename):
+    width, height = table_size(filename)
+    codepoints, packed = load_bitmap_table(filename, width, height)
+    return np.array(codepoints, dtype=np.int64), packed, width, height
+
+
+def write_table(filename, width, height, codepoints, packed):
+    with CompressedTableWriter(filename, width, height) as writer:
+        for cp, glyph in zip(codepoints, packed):
+            writer.add(chr(cp), glyph)
+
+
+def test_tables_found():
+    assert TABLES
+
+
+@pytest.mark.parametrize("filename", TABLES, ids=os.path.basename)
+def test_encode_decode_round_trip(filename):
+    _, packed, width, height = load_table(filename)
+    boxes, stream = encode_glyphs(packed, width)
+    assert np.array_equal(decode_glyphs(boxes, stream, width, height), packed)
+
+
+@pytest.mark.parametrize("filename", TABLES, ids=os.path.basename)
+def test_compressed_table_round_trip(filename, tmp_path):
+    codepoints, packed, width, height = load_table(filename)
+    path = str(tmp_path / "table.hgc")
+    write_table(path, width, height, codepoints, packed)
+
+    loaded_cps, loaded, loaded_width = load_compressed_table(path)
+    assert loaded_width == width
+    assert np.array_equal(loaded_cps, codepoints)
+    assert np.array_equal(loaded, packed)
+
+
+def test_empty_table(tmp_path):
+    packed = np.zeros((0, 16, 2), dtype=np.uint8)
+    boxes, stream = encode_glyphs(packed, 16)
+    assert boxes.shape == (0, 4)
+    assert decode_glyphs(boxes, stream, 16, 16).shape == (0, 16, 2)
+
+    path = str(tmp_path / "empty.hgc")
+    write_table(path, 16, 16, [], packed)
+    codepoints, loaded, width = load_compressed_table(path)
+    assert len(codepoints) == 0
+    assert loaded.shape == (0, 16, 2)
+    assert width == 16
+
+
+def test_blank_glyph(tmp_path):
+    _, packed, width, height = load_table(TABLES[0])
+    packed = packed[:3].copy()
+    packed[1] = 0
+    boxes, stream = encode_glyphs(packed, width)
+    assert tuple(boxes[1]) == (0, 0, 0, 0)
+    assert np.array_equal(decode_glyphs(boxes, stream, width, height), packed)
+
+    path = str(tmp_path / "blank.hgc")
+    write_table(path, width, height, [0xAC00, 0xAC01, 0xAC02], packed)
+    _, loaded, _ = load_compressed_table(path)
+    assert np.array_equal(loaded, packed)
+
+
+def test_unsorted_input(tmp_path):
+    codepoints, packed, width, height = load_table(TABLES[0])
+    order = np.random.default_rng(0).permutation(len(codepoints))
+    path = str(tmp_path / "unsorted.hgc")
+    write_table(path, width, height, codepoints[order], packed[order])
+
+    # 압축 테이블은 코드 포인트 오름차순으로 저장됨
+    loaded_cps, loaded, _ = load_compressed_table(path)
+    expected = np.argsort(codepoints)
+    assert np.array_equal(loaded_cps, codepoints[expected])
+    assert np.array_equal(loaded, packed[expected])
+
+
+def test_abort_on_error(tmp_path):
+    _, packed, width, height = load_table(TABLES[0])
+    path = str(tmp_path / "aborted.hgc")
+    write_table(path, width, height, [0xAC00], packed[:1])
+
+    # 블록이 예외로 끝나면 잘린 테이블도, 이전 실행의 테이블도 남지 않음
+    with pytest.raises(RuntimeError):
+        with CompressedTableWriter(path, width, height) as writer:
+            writer.add("가", packed[0])
+            raise RuntimeError("렌더링 실패")
+    assert not os.path.exists(path)
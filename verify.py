@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import re
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+from bitpack import pack_bits, unpack_bits
+from build import chunk_size, render_task
+from compose import load_bitmap_table
+from fonttable import GlyphTableReader
+from glyph_codec import load_compressed_table
+
+# ==========================================================
+# 픽셀 단위 회귀 검증
+#
+# 기준(golden) 테이블과 비교 대상 테이블을 코드 포인트로 맞춘 뒤,
+# (N, H, 행당 바이트 수) 배열 전체에 대한 XOR 한 번과 popcount 표 조회로
+# 글리프별 해밍 거리(다른 픽셀 수)를 계산합니다.
+# 비교 대상은 같은 이름의 다른 디렉토리 테이블(--candidate-dir)이거나,
+# 현재 렌더러로 다시 렌더링한 결과(--font)입니다.
+# ==========================================================
+
+# 바이트 값별 1비트 개수
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(
+    axis=1
+)
+TABLE_SIZE_PATTERN = re.compile(r"(\d+)x(\d+)")
+
+
+def table_size(filename):
+    """파일명의 {W}x{H}에서 (width, height)를 읽습니다."""
+    match = TABLE_SIZE_PATTERN.search(os.path.basename(filename))
+    if match is None:
+        raise ValueError(f"{filename}: 파일명에서 글리프 크기(WxH)를 찾을 수 없습니다")
+    return int(match.group(1)), int(match.group(2))
+
+
+def load_table(filename):
+    """
+    텍스트(.txt), 바이너리(.bin), 압축(.hgc) 테이블을 읽어
+    (코드 포인트 배열, row_msb (N, H, 행당 바이트 수) 패킹 배열)로 반환합니다.
+    """
+    ext = os.path.splitext(filename)[1]
+    if ext == ".bin":
+        with GlyphTableReader(filename) as table:
+            codepoints = table.codepoints().astype(np.int64)
+            bits = unpack_bits(table.glyphs, table.width, table.height, table.layout)
+            return codepoints, pack_bits(bits)
+    if ext == ".hgc":
+        codepoints, packed, _ = load_compressed_table(filename)
+        return codepoints, packed
+    width, height = table_size(filename)
+    codepoints, packed = load_bitmap_table(filename, width, height)
+    return np.array(codepoints, dtype=np.int64), packed
+
+
+def compare_tables(golden, candidate):
+    """
+    (코드 포인트, 패킹 배열) 두 쌍을 비교하여 결과 딕셔너리를 반환합니다.
+      changed : [(코드 포인트, 해밍 거리)], missing : 비교 대상에 없는 코드 포인트,
+      added   : 기준에 없는 코드 포인트
+    """
+    golden_cps, golden_packed = golden
+    candidate_cps, candidate_packed = candidate
+    golden_cps = np.asarray(golden_cps, dtype=np.int64)
+    candidate_cps = np.asarray(candidate_cps, dtype=np.int64)
+    if golden_packed.shape[1:] != candidate_packed.shape[1:]:
+        raise ValueError(
+            f"글리프 크기가 다릅니다: {golden_packed.shape[1:]} / {candidate_packed.shape[1:]}"
+        )
+
+    common, golden_index, candidate_index = np.intersect1d(
+        golden_cps, candidate_cps, assume_unique=True, return_indices=True
+    )
+    diff = golden_packed[golden_index] ^ candidate_packed[candidate_index]
+    distances = POPCOUNT[diff].reshape(len(common), -1).sum(axis=1)
+    changed = np.flatnonzero(distances)
+    return {
+        "compared": len(common),
+        "changed": [(int(common[i]), int(distances[i])) for i in changed],
+        "missing": np.setdiff1d(golden_cps, candidate_cps).tolist(),
+        "added": np.setdiff1d(candidate_cps, golden_cps).tolist(),
+    }
+
+
+def verify_pair(task):
+    """(기준 파일, 비교 대상 파일) 한 쌍을 비교합니다. 프로세스 풀의 worker에서 호출됩니다."""
+    golden_file, candidate_file = task
+    return compare_tables(load_table(golden_file), load_table(candidate_file))
+
+
+def render_table(golden, font_path, width, pool=None):
+    """기준 테이블의 코드 포인트를 현재 렌더러로 다시 렌더링하여 (코드 포인트, 패킹 배열)로 반환합니다."""
+    codepoints, _ = golden
+    chars = [chr(cp) for cp in codepoints]
+    tasks = [
+        (font_path, width, chars[i : i + chunk_size])
+        for i in range(0, len(chars), chunk_size)
+    ]
+    if pool is not None:
+        packed = pool.map(render_task, tasks)
+    else:
+        packed = [render_task(task) for task in tasks]
+    if not packed:
+        return codepoints, golden[1][:0]
+    return codepoints, np.concatenate(packed)
+
+
+def format_report(name, result, max_report):
+    """비교 결과를 사람이 읽을 수 있는 줄 목록으로 만듭니다."""
+    changed, missing, added = result["changed"], result["missing"], result["added"]
+    if not (changed or missing or added):
+        return [f"OK   {name}: {result['compared']}자 동일"]
+    lines = [
+        f"FAIL {name}: {result['compared']}자 중 {len(changed)}자 다름, "
+        f"누락 {len(missing)}자, 추가 {len(added)}자"
+    ]
+    for cp, distance in changed[:max_report]:
+        lines.append(f"    U+{cp:04X} {chr(cp)}  해밍 거리 {distance}")
+    if len(changed) > max_report:
+        lines.append(f"    ... 외 {len(changed) - max_report}자")
+    for label, cps in (("누락", missing), ("추가", added)):
+        if cps:
+            shown = " ".join(f"U+{cp:04X}" for cp in cps[:max_report])
+            more = f" ... 외 {len(cps) - max_report}자" if len(cps) > max_report else ""
+            lines.append(f"    {label}: {shown}{more}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="생성된 테이블을 기준(golden) 테이블과 픽셀 단위로 비교"
+    )
+    parser.add_argument("golden", nargs="+", help="기준 테이블 (.txt, .bin, .hgc)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--candidate-dir", help="같은 파일명의 비교 대상 테이블이 있는 디렉토리"
+    )
+    target.add_argument(
+        "--font", help="이 폰트로 기준 테이블의 문자를 다시 렌더링하여 비교"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="비교·렌더링에 사용할 프로세스 수 (기본값: CPU 수)",
+    )
+    parser.add_argument(
+        "--max-report", type=int, default=20, help="테이블마다 출력할 최대 글리프 수"
+    )
+    parser.add_argument("-o", "--output", help="전체 결과를 JSON으로 저장할 파일")
+    args = parser.parse_args()
+
+    pool = Pool(args.jobs) if args.jobs > 1 else None
+    try:
+        if args.candidate_dir:
+            tasks = [
+                (golden, os.path.join(args.candidate_dir, os.path.basename(golden)))
+                for golden in args.golden
+            ]
+            if pool is not None:
+                results = pool.map(verify_pair, tasks)
+            else:
+                results = [verify_pair(task) for task in tasks]
+        else:
+            results = []
+            for golden_file in args.golden:
+                golden = load_table(golden_file)
+                width, height = table_size(golden_file)
+                if width != height:
+                    parser.error(f"{golden_file}: 렌더링 비교는 정사각형 글리프만 지원합니다")
+                candidate = render_table(golden, args.font, width, pool)
+                results.append(compare_tables(golden, candidate))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    failed = False
+    for golden_file, result in zip(args.golden, results):
+        failed |= bool(result["changed"] or result["missing"] or result["added"])
+        for line in format_report(golden_file, result, args.max_report):
+            print(line)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(dict(zip(args.golden, results)), f, indent=2, ensure_ascii=False)
+            f.write("\n")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()